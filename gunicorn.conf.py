@@ -0,0 +1,20 @@
+# Loaded by gunicorn from the working directory (/app in the image).
+import os
+import shutil
+import tempfile
+
+# Every worker writes its metrics to files in this directory so that /metrics can add them up. It must
+# be set before prometheus_client is imported, which is when it chooses between files and memory.
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'msms-metrics'))
+
+from prometheus_client import multiprocess  # noqa: E402
+
+
+def on_starting(server):
+    # Start from empty metrics rather than the files of a previous run
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,6 +1,9 @@
-from django.contrib import admin
+import datetime
+
+from django.contrib import admin, messages
 from django.utils.translation import gettext_lazy as _
-from .models import CustomUser, Request, Bank, Child, Booking, Transaction, SchoolTerm
+from .models import CustomUser, Request, Bank, Child, Booking, LessonOccurrence, TeacherAvailability, Transaction, SchoolTerm
+from .scheduling import schedule_requests
 
 
 @admin.register(CustomUser)
@@ -32,6 +35,14 @@ class RequestAdmin(admin.ModelAdmin):
                     'durationOfLessons',
                     'furtherInformation',
                     'user')
+    actions = ['schedule']
+
+    @admin.action(description='Schedule selected requests')
+    def schedule(self, request, queryset):
+        bookings, unscheduled = schedule_requests(queryset, datetime.date.today())
+        self.message_user(request, f'{len(bookings)} bookings created.', messages.SUCCESS)
+        if unscheduled:
+            self.message_user(request, f'{len(unscheduled)} requests have no free slot.', messages.WARNING)
 
 
 @admin.register(Booking)
@@ -40,6 +51,19 @@ class BookingAdmin(admin.ModelAdmin):
                     'interval', 'number_of_lessons', 'price_per_lesson')
 
 
+@admin.register(TeacherAvailability)
+class TeacherAvailabilityAdmin(admin.ModelAdmin):
+    list_display = ('teacher', 'day', 'start_time', 'end_time')
+    list_filter = ('teacher', 'day')
+
+
+@admin.register(LessonOccurrence)
+class LessonOccurrenceAdmin(admin.ModelAdmin):
+    list_display = ('date', 'start_time', 'end_time', 'teacher', 'booking')
+    list_filter = ('teacher',)
+    date_hierarchy = 'date'
+
+
 @admin.register(Bank)
 class BankAdmin(admin.ModelAdmin):
     list_display = ('balance',
@@ -54,7 +78,7 @@ class ChildAdmmin(admin.ModelAdmin):
 
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
-    list_display = ('invoice_id',
+    list_display = ('invoice_number',
     'transfer_date',
     'amount',
     'user')
@@ -0,0 +1,147 @@
+import platform
+import statistics
+import subprocess
+import time
+
+import django
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from lessons.models import Booking, CustomUser, Request, SchoolTerm
+
+BENCHMARK_ITERATIONS = 20
+# The fixed seed account each role's views are requested as
+ROLE_EMAILS = {
+    'Student': 'john.doe@example.org',
+    'Admin': 'petra.pickles@example.org',
+    'Director': 'marty.major@example.org',
+}
+# Named URLs of msms/urls.py that are not benchmarked: log out would end the session the remaining
+# views are requested with, and metrics only answers the Prometheus scraper's token (the Django admin
+# site under admin/ is not benchmarked either)
+SKIPPED_URLS = {'log_out', 'metrics'}
+
+
+def _student_request(student):
+    return Request.objects.filter(user=student).order_by('id').values_list('id', flat=True).first()
+
+
+def _student_booking(student):
+    return Booking.objects.filter(user=student).order_by('id').values_list('id', flat=True).first()
+
+
+# (url name, role or None for an anonymous visitor, function returning the URL's kwargs)
+BENCHMARK_VIEWS = [
+    ('home', None, None),
+    ('sign_up', None, None),
+    ('log_in', None, None),
+    ('student', 'Student', None),
+    ('add_children', 'Student', None),
+    ('request', 'Student', None),
+    ('transactions', 'Student', None),
+    ('balance', 'Student', None),
+    ('edit_request', 'Student', lambda users: {'request_id': _student_request(users['Student'])}),
+    ('administrators', 'Admin', None),
+    ('booking', 'Admin', lambda users: {'request_id': _student_request(users['Student'])}),
+    ('edit_booking', 'Admin', lambda users: {'booking_id': _student_booking(users['Student'])}),
+    ('all_transactions', 'Admin', None),
+    ('export_transactions', 'Admin', None),
+    ('import_statement', 'Admin', None),
+    ('balance_report', 'Admin', None),
+    ('revenue_summary', 'Admin', None),
+    ('school_term', 'Admin', None),
+    ('edit_term', 'Admin', lambda users: {'term_id': SchoolTerm.objects.order_by('id').values_list('id', flat=True)[0]}),
+    ('admin_list', 'Director', None),
+    ('create_admin', 'Director', None),
+    ('edit_user', 'Director', lambda users: {'user_id': users['Admin'].id}),
+]
+
+
+def percentile(values, fraction):
+    """Return the value below which the given fraction of values fall, interpolating between neighbours."""
+    values = sorted(values)
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class QueryTimer:
+    """A database execute wrapper counting the queries run and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def benchmark_view(client, url, iterations=BENCHMARK_ITERATIONS):
+    """Request url iterations times after one warm-up request and return its latency and SQL statistics."""
+    _get(client, url)
+    latencies, query_counts, sql_times = [], [], []
+    status = None
+    for _ in range(iterations):
+        timer = QueryTimer()
+        with connection.execute_wrapper(timer):
+            started = time.perf_counter()
+            status = _get(client, url)
+            latencies.append((time.perf_counter() - started) * 1000)
+        query_counts.append(timer.count)
+        sql_times.append(timer.seconds * 1000)
+    return {
+        'url': url,
+        'status': status,
+        'p50_ms': round(percentile(latencies, 0.5), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'queries': max(query_counts),
+        'sql_ms': round(statistics.median(sql_times), 3),
+    }
+
+
+def _get(client, url):
+    response = client.get(url)
+    if response.streaming:
+        for chunk in response.streaming_content:
+            pass
+    return response.status_code
+
+
+def run_benchmarks(iterations=BENCHMARK_ITERATIONS, views=None):
+    """Benchmark every view in BENCHMARK_VIEWS, or the named ones, as its role and return the results by URL name.
+
+    Expects the database to hold the seed command's fixed accounts and terms.
+    """
+    users = {role: CustomUser.objects.get(email=email) for role, email in ROLE_EMAILS.items()}
+    clients = {None: Client()}
+    for role, user in users.items():
+        clients[role] = Client()
+        clients[role].force_login(user)
+    results = {}
+    for name, role, url_kwargs in BENCHMARK_VIEWS:
+        if views and name not in views:
+            continue
+        url = reverse(name, kwargs=url_kwargs(users) if url_kwargs else None)
+        results[name] = dict(benchmark_view(clients[role], url, iterations), role=role or 'Anonymous')
+    return results
+
+
+def benchmark_environment():
+    """Return what the results depend on besides the code: versions, database and commit."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+    }
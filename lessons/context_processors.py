@@ -0,0 +1,8 @@
+from django.utils.functional import SimpleLazyObject
+
+from lessons.helpers import get_user_groups
+
+
+def user_groups(request):
+    """Expose the current user's group names to templates, loaded at most once per request."""
+    return {'user_groups': SimpleLazyObject(lambda: get_user_groups(request.user))}
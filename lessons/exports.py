@@ -0,0 +1,59 @@
+import csv
+import json
+
+from lessons.models import Transaction
+
+EXPORT_CHUNK_SIZE = 2000  # rows fetched from the database per round trip
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+# A spreadsheet runs a cell starting with one of these as a formula; such cells are prefixed with '
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+TRANSACTION_EXPORT_FIELDS = ['id', 'invoice_number', 'transfer_date', 'amount', 'user_id', 'user__email',
+                             'user__first_name', 'user__last_name']
+
+
+class Echo:
+    """A file-like object whose write() returns the line instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def transactions_for_export(start=None, end=None, user=None):
+    """Return the transactions to export as value tuples ordered by id, optionally filtered."""
+    transactions = Transaction.objects.order_by('id')
+    if start:
+        transactions = transactions.filter(transfer_date__gte=start)
+    if end:
+        transactions = transactions.filter(transfer_date__lte=end)
+    if user:
+        transactions = transactions.filter(user__email=user)
+    return transactions.values_list(*TRANSACTION_EXPORT_FIELDS)
+
+
+def csv_safe(value):
+    """Return value with a leading ' if it is text a spreadsheet would run as a formula."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def export_lines(rows, fields, export_format='csv'):
+    """Yield rows as lines of CSV or JSONL, reading them from the database in chunks.
+
+    Only one chunk of rows is held in memory at a time (a server-side cursor on Postgres), so
+    exporting the whole table runs in constant memory. CSV cells that a spreadsheet would run as
+    formulas are escaped.
+    """
+    if hasattr(rows, 'iterator'):
+        rows = rows.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if export_format == 'jsonl':
+        for row in rows:
+            yield json.dumps(dict(zip(fields, row)), default=str) + '\n'
+    else:
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow([csv_safe(value) for value in row])
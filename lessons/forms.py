@@ -1,8 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django import forms
-from django.db.models import Q
-from lessons.models import CustomUser, Request, Bank, Child, Booking, SchoolTerm, Transaction
+from lessons.models import CustomUser, Request, Bank, Child, Booking, SchoolTerm, Transaction, DAY_OF_THE_WEEK
+from lessons.scheduling import SCHEDULE_FIELDS, find_conflicts
+from lessons.statements import is_utf8
 
 class LogInForm(forms.Form):
     email = forms.CharField(label="Email")
@@ -68,26 +69,49 @@ class BookingForm(forms.ModelForm):
             'time': forms.TimeInput(attrs={'type': 'time'}),
         }
 
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.errors:
+            return cleaned_data
+        candidate = Booking(id=self.instance.pk, **{field: cleaned_data.get(field) for field in SCHEDULE_FIELDS})
+        clash = find_conflicts(candidate).first()
+        if clash is not None:
+            self.add_error('time', f'{clash.teacher} already has a lesson on {clash.date:%d/%m/%Y} '
+                                   f'from {clash.start_time:%H:%M} to {clash.end_time:%H:%M}.')
+        return cleaned_data
+
     def save(self, user=None):
-        if user is None:
-            return super().save()
-        super().save(commit=False)
-        total_price = int(self.cleaned_data.get('number_of_lessons')) * int(self.cleaned_data.get('price_per_lesson'))
-        new_booking = Booking.objects.create(day=self.cleaned_data.get('day'),
-                                            time=self.cleaned_data.get('time'),
-                                            teacher=self.cleaned_data.get('teacher'),
-                                            start_date=self.cleaned_data.get('start_date'),
-                                            duration=self.cleaned_data.get('duration'),
-                                            interval=self.cleaned_data.get('interval'),
-                                            number_of_lessons=self.cleaned_data.get('number_of_lessons'),
-                                            price_per_lesson=self.cleaned_data.get('price_per_lesson'),
-                                            full_price = total_price,
-                                            user=user
-                                        )
-        return new_booking
+        booking = super().save(commit=False)  # edits update the booking in place so its payments stay linked
+        booking.full_price = self.cleaned_data.get('number_of_lessons') * self.cleaned_data.get('price_per_lesson')
+        if user is not None:
+            booking.user = user
+        booking.save()
+        return booking
+
+
+class BookingFilterForm(forms.Form):
+    day = forms.ChoiceField(choices=[('', 'Any day')] + DAY_OF_THE_WEEK, required=False)
+    teacher = forms.CharField(max_length=30, required=False)
+    start_date = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+
+    def filter_requests(self, requests):
+        if self.cleaned_data.get('day'):
+            requests = requests.filter(daysAvailable=self.cleaned_data['day'])
+        return requests
+
+    def filter_bookings(self, bookings):
+        if self.cleaned_data.get('day'):
+            bookings = bookings.filter(day=self.cleaned_data['day'])
+        if self.cleaned_data.get('teacher'):
+            bookings = bookings.filter(teacher=self.cleaned_data['teacher'])
+        if self.cleaned_data.get('start_date'):
+            bookings = bookings.filter(start_date=self.cleaned_data['start_date'])
+        return bookings
 
 
 class TransactionForm(forms.ModelForm):
+    invoice_id = forms.IntegerField(label='Invoice id')
+
     class Meta:
         model = Transaction
         fields = ['invoice_id', 'transfer_date', 'amount']
@@ -107,6 +131,37 @@ class TransactionForm(forms.ModelForm):
         return new_invoice
 
 
+class TransactionExportForm(forms.Form):
+    format = forms.ChoiceField(choices=[('csv', 'CSV'), ('jsonl', 'JSON Lines')], required=False)
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+    user = forms.EmailField(required=False)
+
+
+class BalanceReportForm(forms.Form):
+    show = forms.ChoiceField(choices=[('debtors', 'Debtors'), ('overpaid', 'Overpaid'), ('all', 'All balances')],
+                             required=False)
+    format = forms.ChoiceField(choices=[('', 'Page'), ('csv', 'CSV'), ('jsonl', 'JSON Lines')], required=False)
+
+
+class RollupSummaryForm(forms.Form):
+    group_by = forms.ChoiceField(choices=[('month', 'Month'), ('term', 'Term'), ('teacher', 'Teacher'),
+                                          ('weekday', 'Day of the week')], required=False)
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+    format = forms.ChoiceField(choices=[('', 'Page'), ('csv', 'CSV'), ('jsonl', 'JSON Lines')], required=False)
+
+
+class StatementUploadForm(forms.Form):
+    statement = forms.FileField(label='Bank statement (CSV with invoice_id, date, amount and optional reference columns)')
+
+    def clean_statement(self):
+        statement = self.cleaned_data['statement']
+        if not is_utf8(statement):
+            raise forms.ValidationError('The statement must be a CSV file encoded as UTF-8.')
+        return statement
+
+
 class BalanceForm(forms.ModelForm):
     class Meta:
         model = Bank
@@ -149,39 +204,20 @@ class SchoolTermForm(forms.ModelForm):
         end_date = cleaned_data.get('end_date')
         start_date = cleaned_data.get('start_date')
         term_number = cleaned_data.get('term_number')
-        term_id = cleaned_data.get('id')
+        if start_date is None or end_date is None:
+            return cleaned_data
 
-        exclude_value = SchoolTerm.objects.filter(~Q(id=term_id))
+        other_terms = SchoolTerm.objects.exclude(pk=self.instance.pk)
 
         if end_date <= start_date:
             self.add_error('end_date', 'End date should be greater than the start date.')
 
-        checker = False
-        for existing_terms in exclude_value:
-            if (existing_terms.end_date >= start_date and existing_terms.start_date <= end_date):
-                checker = True
-        if checker:
+        if other_terms.filter(start_date__lte=end_date, end_date__gte=start_date).exists():
             self.add_error('start_date', 'Term dates cannot overlap.')
 
         if (start_date.month <= 8 and end_date.month >= 8):
             self.add_error('start_date',
                            'There should not be a school term in August. The academic school year starts in September and ends in July.')
-        else:
-            another_checker = False
-            for existing_terms in exclude_value:
-                if existing_terms.start_date.month >= 9 and existing_terms.start_date.month <= 12:
-                    if start_date.month >= 9 and start_date.month <= 12:
-                        if existing_terms.term_number == term_number and existing_terms.start_date.year == start_date.year:
-                            another_checker = True
-                    else:
-                        if existing_terms.term_number == term_number and existing_terms.start_date.year + 1 == start_date.year:
-                            another_checker = True
-                else:
-                    if not (start_date.month >= 9 and start_date.month <= 12):
-                        if existing_terms.term_number == term_number and existing_terms.start_date.year == start_date.year:
-                            another_checker = True
-                    else:
-                        if existing_terms.term_number == term_number and existing_terms.start_date.year - 1 == start_date.year:
-                            another_checker = True
-            if another_checker:
-                self.add_error('term_number', f'Term {term_number} already exists for this academic year.')
+        elif other_terms.filter(academic_year=SchoolTerm.academic_year_of(start_date), term_number=term_number).exists():
+            self.add_error('term_number', f'Term {term_number} already exists for this academic year.')
+        return cleaned_data
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from django.db import DatabaseError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse
+
+READINESS_CACHE_SECONDS = 5  # how long a readiness result is reused before the database is pinged again
+DB_PING_TIMEOUT_MS = 1000
+
+
+class ReadinessCheck:
+    """Whether this process can serve traffic: the database answers and every migration is applied.
+
+    The result is reused for READINESS_CACHE_SECONDS, so probes from any number of sources cost one
+    ping per interval. Migrations are only checked until they are found applied, as a running process
+    never sees them unapplied again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._result = None
+        self._checked_at = 0.0
+        self._migrated = False
+
+    def check(self):
+        """Return (ready, reason), pinging the database if the last result is too old."""
+        with self._lock:
+            if self._result is None or time.monotonic() - self._checked_at >= READINESS_CACHE_SECONDS:
+                self._result = self._check()
+                self._checked_at = time.monotonic()
+            return self._result
+
+    def _check(self):
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    cursor.execute('SET LOCAL statement_timeout = %s', [DB_PING_TIMEOUT_MS])
+                cursor.execute('SELECT 1')
+            if not self._migrated:
+                executor = MigrationExecutor(connection)
+                if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+                    return False, 'unapplied migrations'
+                self._migrated = True
+        except DatabaseError as error:
+            return False, f'database unavailable: {error.__class__.__name__}'
+        return True, 'ready'
+
+
+readiness = ReadinessCheck()
+
+
+class HealthCheckMiddleware:
+    """Answer the liveness (/healthz) and readiness (/readyz) probes before any other middleware.
+
+    Probes skip sessions, authentication, templates and the other middleware, so they stay cheap
+    and are not held up by them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == '/healthz':
+            return HttpResponse('ok', content_type='text/plain')
+        if request.path == '/readyz':
+            ready, reason = readiness.check()
+            return HttpResponse(reason, content_type='text/plain', status=200 if ready else 503)
+        return self.get_response(request)
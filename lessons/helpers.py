@@ -1,18 +1,85 @@
+import datetime
+
+from django.core.management.base import CommandError
 from django.shortcuts import redirect
 from django.contrib.auth.models import Group
 
+from lessons.profiling import span
+
+PAGE_SIZE = 25
+
+
+def get_user_groups(user):
+    """Return the names of the groups the user belongs to.
+
+    The names are loaded at most once per request, memoized on the user object. They are not kept
+    between requests, so a change of role applies to the user's next request in every worker.
+    """
+    with span('auth'):
+        if not user.is_authenticated:
+            return frozenset()
+        names = getattr(user, '_group_names', None)
+        if names is None:
+            names = frozenset(user.groups.values_list('name', flat=True))
+            user._group_names = names
+        return names
+
+
+def get_int_param(params, name):
+    """Return the query parameter as an int, or None if it is missing or not a number."""
+    try:
+        return int(params.get(name, ''))
+    except ValueError:
+        return None
+
+
+def parse_date_option(options, name):
+    """Return the named YYYY-MM-DD option of a management command as a date, or None if it is not given."""
+    value = options[name]
+    if value is None:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'--{name} must be a date in YYYY-MM-DD format, not {value!r}')
+
+
+def keyset_page(queryset, after=None, page_size=PAGE_SIZE):
+    """Return one page of queryset ordered by primary key, and the key to request the next page with.
+
+    Rows are fetched with an indexed pk > after range scan instead of an OFFSET, so every page costs
+    the same however deep it is.
+    """
+    if after is not None:
+        queryset = queryset.filter(pk__gt=after)
+    rows = list(queryset.order_by('pk')[:page_size + 1])
+    next_after = rows[page_size - 1].pk if len(rows) > page_size else None
+    return rows[:page_size], next_after
+
+
+def page_url(request, **params):
+    """Return the query string of the current page with the given parameters replaced."""
+    query = request.GET.copy()
+    for name, value in params.items():
+        if value is None:
+            query.pop(name, None)
+        else:
+            query[name] = value
+    return f'?{query.urlencode()}'
+
 
 def group_required(group):
     def decorator(view_function):
         def modified_view_function(request, *args, **kwargs):
-            if request.user.groups.filter(name=group).exists() or (request.user.groups.filter(name='Director') and group=='Admin'):
+            groups = get_user_groups(request.user)
+            if group in groups or ('Director' in groups and group == 'Admin'):
                 return view_function(request, *args, **kwargs)
             else:
-                if request.user.groups.filter(name='Admin').exists():
+                if 'Admin' in groups:
                     return redirect('administrators')
-                if request.user.groups.filter(name='Director').exists():
+                if 'Director' in groups:
                     return redirect('admin_list')
-                if request.user.groups.filter(name='Student').exists():
+                if 'Student' in groups:
                     return redirect('student')
                 else:
                     return redirect('log_in')
@@ -24,9 +91,10 @@ def group_required(group):
 def login_prohibited(view_function):
     def modified_view_function(request):
         if request.user.is_authenticated:
-            if request.user.groups.filter(name='Admin').exists():
+            groups = get_user_groups(request.user)
+            if 'Admin' in groups:
                 return redirect('administrators')
-            if request.user.groups.filter(name='Director').exists():
+            if 'Director' in groups:
                 return redirect('admin_list')
             else:
                 return redirect('student')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from lessons.exports import EXPORT_FORMATS, export_lines
+from lessons.reports import BALANCE_FILTERS, BALANCE_REPORT_FIELDS, balance_rows, balances
+
+
+class Command(BaseCommand):
+    help = 'Stream the amount each user owes, or has overpaid, per child as CSV or JSONL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--show', choices=BALANCE_FILTERS, default='debtors')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--output', help='file to write to instead of standard output')
+
+    def handle(self, *args, **options):
+        lines = export_lines(balance_rows(balances(options['show'])), BALANCE_REPORT_FIELDS, options['format'])
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
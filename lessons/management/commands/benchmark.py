@@ -0,0 +1,46 @@
+import json
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from lessons.benchmarks import BENCHMARK_ITERATIONS, benchmark_environment, run_benchmarks
+from lessons.seeding import PROFILES
+
+
+class Command(BaseCommand):
+    help = ('Seed a test database with a workload profile, request every view as its role and report p50/p95 '
+            'latency, query count and SQL time per view as JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', choices=PROFILES, default='small')
+        parser.add_argument('--iterations', type=int, default=BENCHMARK_ITERATIONS)
+        parser.add_argument('--view', action='append', dest='views', help='only benchmark this URL name (repeatable)')
+        parser.add_argument('--output', help='file to write the JSON results to instead of standard output')
+
+    # Pages are rendered without running collectstatic first, which the manifest storage would refuse
+    @override_settings(STATICFILES_STORAGE='whitenoise.storage.CompressedStaticFilesStorage')
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            call_command('seed', profile=options['profile'], stdout=self.stderr)
+            results = {
+                'profile': options['profile'],
+                'users': PROFILES[options['profile']],
+                'iterations': options['iterations'],
+                'environment': benchmark_environment(),
+                'views': run_benchmarks(options['iterations'], options['views']),
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        output = json.dumps(results, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as results_file:
+                results_file.write(output + '\n')
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from lessons.exports import EXPORT_FORMATS, TRANSACTION_EXPORT_FIELDS, export_lines, transactions_for_export
+from lessons.helpers import parse_date_option
+
+
+class Command(BaseCommand):
+    help = 'Stream transactions as CSV or JSONL, optionally filtered by transfer date and user email.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--start', help='first transfer date to include (YYYY-MM-DD)')
+        parser.add_argument('--end', help='last transfer date to include (YYYY-MM-DD)')
+        parser.add_argument('--user', help='only export transactions of the user with this email')
+        parser.add_argument('--output', help='file to write to instead of standard output')
+
+    def handle(self, *args, **options):
+        rows = transactions_for_export(parse_date_option(options, 'start'), parse_date_option(options, 'end'),
+                                       options['user'])
+        lines = export_lines(rows, TRANSACTION_EXPORT_FIELDS, options['format'])
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
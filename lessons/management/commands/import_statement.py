@@ -0,0 +1,31 @@
+import io
+
+from django.core.management.base import BaseCommand, CommandError
+
+from lessons.statements import (STATEMENT_BATCH_SIZE, STATEMENT_ENCODING, StatementAlreadyImported, import_statement,
+                                is_utf8, read_statement, statement_digest, write_rejects)
+
+
+class Command(BaseCommand):
+    help = 'Import a CSV bank statement (invoice_id, date, amount, optional reference) and apply its payments to bookings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help='CSV file with invoice_id, date, amount and optional reference columns')
+        parser.add_argument('--reject-file', default='rejects.csv', help='where to write rows that could not be matched')
+        parser.add_argument('--batch-size', type=int, default=STATEMENT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        with open(options['statement'], 'rb') as statement:
+            if not is_utf8(statement):
+                raise CommandError(f"{options['statement']} is not encoded as UTF-8")
+            digest = statement_digest(statement)
+            lines = io.TextIOWrapper(statement, encoding=STATEMENT_ENCODING, newline='')
+            try:
+                imported, rejected = import_statement(read_statement(lines), options['batch_size'], digest)
+            except StatementAlreadyImported as error:
+                raise CommandError(f"{options['statement']}: {error}")
+        self.stdout.write(self.style.SUCCESS(f'Payments imported: {imported}'))
+        if rejected:
+            with open(options['reject_file'], 'w', newline='') as output:
+                write_rejects(rejected, output)
+            self.stdout.write(self.style.WARNING(f"Rows rejected: {len(rejected)} (see {options['reject_file']})"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from lessons.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily revenue and lesson rollups of the days changed since the last refresh.'
+
+    def handle(self, *args, **options):
+        days = refresh_rollups()
+        self.stdout.write(f'Recomputed the rollups of {days} days.')
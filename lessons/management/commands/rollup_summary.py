@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from lessons.exports import EXPORT_FORMATS, export_lines
+from lessons.helpers import parse_date_option
+from lessons.reports import ROLLUP_GROUPS, ROLLUP_SUMMARY_FIELDS, rollup_summary
+
+
+class Command(BaseCommand):
+    help = 'Write lesson and payment totals per month, term, teacher or weekday from the daily rollups.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--by', choices=ROLLUP_GROUPS, default='month')
+        parser.add_argument('--start', help='first day to include (YYYY-MM-DD)')
+        parser.add_argument('--end', help='last day to include (YYYY-MM-DD)')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+
+    def handle(self, *args, **options):
+        rows = rollup_summary(options['by'], parse_date_option(options, 'start'), parse_date_option(options, 'end'))
+        for line in export_lines([[row[field] for field in ROLLUP_SUMMARY_FIELDS] for row in rows],
+                                 ROLLUP_SUMMARY_FIELDS, options['format']):
+            self.stdout.write(line, ending='')
@@ -0,0 +1,22 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from lessons.models import Request
+from lessons.scheduling import schedule_requests
+
+
+class Command(BaseCommand):
+    help = 'Turn all pending lesson requests into bookings within the teachers\' availability.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', type=datetime.date.fromisoformat, default=None,
+                            help='date from which lessons are scheduled (YYYY-MM-DD, default today)')
+        parser.add_argument('--price-per-lesson', type=int, default=50)
+
+    def handle(self, *args, **options):
+        start_date = options['start_date'] or datetime.date.today()
+        bookings, unscheduled = schedule_requests(Request.objects.all(), start_date, options['price_per_lesson'])
+        self.stdout.write(self.style.SUCCESS(f'Bookings created: {len(bookings)}'))
+        if unscheduled:
+            self.stdout.write(self.style.WARNING(f'Requests without a free slot: {len(unscheduled)}'))
@@ -1,11 +1,15 @@
 import datetime
-from random import randint
+import os
+import time
+from random import choice, randint
 
 from django.core.management.base import BaseCommand
 from django.db import transaction, IntegrityError
 from django.contrib.auth.models import Group
 from faker import Faker
 
+from lessons import seeding
+from lessons.scheduling import WEEKDAYS, find_conflicts
 from lessons.models import (
     Bank,
     CustomUser as User,
@@ -22,21 +26,46 @@ class Command(BaseCommand):
     - Safe to run multiple times.
     - Uses get_or_create / update_or_create to avoid duplicates.
     - Bulk random users use faker.unique.email() to avoid collisions.
+    - With --profile or --users N, numbered students (student1@seed.example.org, ...) are generated
+      in parallel worker processes and bulk loaded instead (see lessons.seeding); a rerun skips the
+      ones that already exist.
     """
     PASSWORD = "Password123"
     USER_COUNT = 100  # number of random students to create
+    BOOKING_ATTEMPTS = 20  # random slots tried for a random student's booking before giving up on it
 
     def __init__(self):
         super().__init__()
         # Australia locale to match your AU branding
         self.faker = Faker("en_AU")
 
+    def add_arguments(self, parser):
+        parser.add_argument("--profile", choices=seeding.PROFILES,
+                            help="bulk load the numbered students of a workload profile: "
+                                 + ", ".join(f"{name} ({users})" for name, users in seeding.PROFILES.items()))
+        parser.add_argument("--users", type=int, help="bulk load this many numbered students")
+        parser.add_argument("--batch-size", type=int, default=seeding.BATCH_SIZE,
+                            help="students generated and loaded per transaction in bulk mode")
+        parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                            help="processes generating students in bulk mode")
+
     def handle(self, *args, **options):
         with transaction.atomic():
             self.stdout.write(self.style.NOTICE("Seeding fixed data..."))
             self._seed_fixed_users_and_groups()
             self._seed_school_terms()
 
+        users = options["users"] if options["users"] is not None else seeding.PROFILES.get(options["profile"])
+        if users is not None:
+            self.stdout.write(self.style.NOTICE(f"Bulk seeding {users} students with {options['workers']} workers..."))
+            started = time.monotonic()
+            created = seeding.seed_students(users, options["batch_size"], options["workers"],
+                                            progress=lambda done, total: self.stdout.write(f"  {done} / {total}"))
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(f"Bulk students created: {created} in {elapsed:.1f}s"))
+            self.stdout.write(self.style.SUCCESS("Seeding complete."))
+            return
+
         self.stdout.write(self.style.NOTICE(f"Seeding {Command.USER_COUNT} random students..."))
         created = self._seed_random_students(Command.USER_COUNT)
         self.stdout.write(self.style.SUCCESS(f"Random students created: {created}"))
@@ -66,9 +95,9 @@ class Command(BaseCommand):
         self._ensure_request(
             user=user,
             day="FRI",
-            number="6",
-            interval="2 WEEKS",
-            duration="60 Minutes",
+            number=6,
+            interval=2,
+            duration=60,
         )
 
         # Two children + linked bookings
@@ -79,12 +108,12 @@ class Command(BaseCommand):
             user=user,
             child=None,
             day="FRI",
-            time=datetime.time(16, 0, 0),
+            time=datetime.time(15, 0, 0),
             teacher="Smith Jane",
             start_date=datetime.date(2022, 12, 2),
-            duration="60 Minutes",
-            interval="2 WEEKS",
-            number_of_lessons="6",
+            duration=60,
+            interval=2,
+            number_of_lessons=6,
             full_price=150,
             payment_made=150,
         )
@@ -95,9 +124,9 @@ class Command(BaseCommand):
             time=datetime.time(16, 0, 0),
             teacher="Smith Jane",
             start_date=datetime.date(2022, 12, 2),
-            duration="60 Minutes",
-            interval="2 WEEKS",
-            number_of_lessons="6",
+            duration=60,
+            interval=2,
+            number_of_lessons=6,
             full_price=150,
             payment_made=150,
         )
@@ -105,12 +134,12 @@ class Command(BaseCommand):
             user=user,
             child=bob,
             day="FRI",
-            time=datetime.time(16, 0, 0),
+            time=datetime.time(17, 0, 0),
             teacher="Smith Jane",
             start_date=datetime.date(2022, 12, 2),
-            duration="60 Minutes",
-            interval="2 WEEKS",
-            number_of_lessons="6",
+            duration=60,
+            interval=2,
+            number_of_lessons=6,
             full_price=150,
             payment_made=150,
         )
@@ -152,7 +181,7 @@ class Command(BaseCommand):
             # create_bank() is assumed to initialize a bank record for the user
             Bank.objects.create_bank(user)
 
-    def _ensure_request(self, user: User, day: str, number: str, interval: str, duration: str, child: Child | None = None):
+    def _ensure_request(self, user: User, day: str, number: int, interval: int, duration: int, child: Child | None = None):
         # Avoid duplicate sample request: use a minimal uniqueness guard
         if not Request.objects.filter(
             user=user,
@@ -178,9 +207,9 @@ class Command(BaseCommand):
         time: datetime.time,
         teacher: str,
         start_date: datetime.date,
-        duration: str,
-        interval: str,
-        number_of_lessons: str,
+        duration: int,
+        interval: int,
+        number_of_lessons: int,
         full_price: int,
         payment_made: int,
         child: Child | None = None,
@@ -257,24 +286,13 @@ class Command(BaseCommand):
                         self._ensure_request(
                             user=user,
                             day="FRI",
-                            number="6",
-                            interval="2 WEEKS",
-                            duration="60 Minutes",
+                            number=6,
+                            interval=2,
+                            duration=60,
                         )
 
                     if randint(0, 100) <= 20:
-                        Booking.objects.create(
-                            day="FRI",
-                            time=datetime.time(16, 0, 0),
-                            teacher="Smith Jane",
-                            start_date=datetime.date(2022, 12, 2),
-                            duration="60 Minutes",
-                            interval="2 WEEKS",
-                            number_of_lessons="6",
-                            full_price=150,
-                            payment_made=self._payment_made_value(),
-                            user=user,
-                        )
+                        self._create_free_booking(user=user)
 
                     if randint(0, 100) >= 30:
                         child = Child.objects.create(
@@ -284,28 +302,16 @@ class Command(BaseCommand):
                         )
 
                         if randint(0, 100) >= 30:
-                            Booking.objects.create(
-                                day="FRI",
-                                time=datetime.time(16, 0, 0),
-                                teacher="Smith Jane",
-                                start_date=datetime.date(2022, 12, 2),
-                                duration="60 Minutes",
-                                interval="2 WEEKS",
-                                number_of_lessons="6",
-                                full_price=150,
-                                payment_made=self._payment_made_value(),
-                                user=user,
-                                child=child,
-                            )
+                            self._create_free_booking(user=user, child=child)
 
                         if randint(0, 100) <= 30:
                             self._ensure_request(
                                 user=user,
                                 child=child,
                                 day="FRI",
-                                number="6",
-                                interval="2 WEEKS",
-                                duration="60 Minutes",
+                                number=6,
+                                interval=2,
+                                duration=60,
                             )
 
                     created += 1
@@ -319,6 +325,27 @@ class Command(BaseCommand):
     # ---------------------------
     # Helpers
     # ---------------------------
+    def _create_free_booking(self, user: User, child: Child | None = None):
+        # Try random slots until one does not double book the teacher, or skip the booking
+        for _ in range(Command.BOOKING_ATTEMPTS):
+            booking = Booking(
+                day=choice(WEEKDAYS[:6]),
+                time=datetime.time(randint(8, 17), 0, 0),
+                teacher="Smith Jane",
+                start_date=datetime.date(2022, 9, 5) + datetime.timedelta(days=randint(0, 280)),
+                duration=60,
+                interval=2,
+                number_of_lessons=6,
+                full_price=150,
+                payment_made=self._payment_made_value(),
+                user=user,
+                child=child,
+            )
+            if not find_conflicts(booking).exists():
+                booking.save()
+                return booking
+        return None
+
     def _payment_made_value(self) -> int:
         r = randint(0, 40)
         if r <= 10:
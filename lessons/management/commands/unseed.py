@@ -1,8 +1,18 @@
-from django.core.management.base import BaseCommand, CommandError
-from lessons.models import SchoolTerm, CustomUser as User
+import time
+
+from django.core.management.base import BaseCommand
+
+from lessons.seeding import FIXED_EMAILS, unseed
 
 
 class Command(BaseCommand):
+    help = 'Delete every student, their data and the school terms with set-based deletes (truncates on Postgres).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-fixed', action='store_true',
+                            help=f'keep the fixed seed accounts: {", ".join(FIXED_EMAILS)}')
+
     def handle(self, *args, **options):
-        User.objects.filter(is_staff=False, is_superuser=False).delete()
-        SchoolTerm.objects.all().delete()
+        started = time.monotonic()
+        unseed(keep_fixed=options['keep_fixed'])
+        self.stdout.write(self.style.SUCCESS(f'Unseeded in {time.monotonic() - started:.1f}s.'))
@@ -0,0 +1,57 @@
+import os
+import time
+
+from django.db import connection
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR (set in gunicorn.conf.py) makes every worker write its
+# samples to files there, and metrics_text() adds up the files of all workers.
+REQUESTS = Counter('msms_requests_total', 'Requests handled, by URL name, method and status code.',
+                   ['view', 'method', 'status'])
+REQUEST_LATENCY = Histogram('msms_request_duration_seconds', 'Time taken to handle a request, by URL name.', ['view'],
+                            buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+REQUEST_QUERIES = Histogram('msms_request_queries', 'Database queries run by a request, by URL name.', ['view'],
+                            buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89))
+PAYMENTS = Counter('msms_payments_total', 'Payments submitted by students, by outcome.', ['outcome'])
+LOGINS = Counter('msms_logins_total', 'Log in attempts, by outcome.', ['outcome'])
+
+
+class QueryCounter:
+    """A database execute wrapper counting the queries run."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """Count every request and observe its latency and number of queries, labelled by URL name."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        view = request.resolver_match.view_name if request.resolver_match else 'unmatched'
+        REQUESTS.labels(view, request.method, response.status_code).inc()
+        REQUEST_LATENCY.labels(view).observe(time.perf_counter() - started)
+        REQUEST_QUERIES.labels(view).observe(queries.count)
+        return response
+
+
+def metrics_text():
+    """Return the metrics in the Prometheus text format, added up across worker processes if there are several."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
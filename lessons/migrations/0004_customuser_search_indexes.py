@@ -0,0 +1,37 @@
+from django.db import migrations
+
+SEARCH_COLUMNS = ['email', 'first_name', 'last_name']
+
+
+def add_search_indexes(apps, schema_editor):
+    """Index the columns the admin list's case-insensitive prefix search filters on.
+
+    istartswith compiles to UPPER(column::text) LIKE UPPER(%s) on Postgres, which only an index on
+    the same expression with the pattern operator class can serve. On SQLite it compiles to a plain
+    LIKE, which is case-insensitive and can only use an index with the NOCASE collation.
+    """
+    vendor = schema_editor.connection.vendor
+    for column in SEARCH_COLUMNS:
+        if vendor == 'postgresql':
+            schema_editor.execute(f'CREATE INDEX lessons_customuser_{column}_search ON lessons_customuser '
+                                  f'(UPPER({column}) text_pattern_ops)')
+        elif vendor == 'sqlite':
+            schema_editor.execute(f'CREATE INDEX lessons_customuser_{column}_search ON lessons_customuser '
+                                  f'({column} COLLATE NOCASE)')
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        for column in SEARCH_COLUMNS:
+            schema_editor.execute(f'DROP INDEX lessons_customuser_{column}_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0003_alter_booking_payment_made'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_indexes, remove_search_indexes),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.1.3 on 2026-10-17 22:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0004_customuser_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['day'], name='lessons_boo_day_563b92_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['teacher', 'start_date'], name='lessons_boo_teacher_042591_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['start_date'], name='lessons_boo_start_d_73c6a7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['daysAvailable'], name='lessons_req_daysAva_49afea_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def link_invoices(apps, schema_editor):
+    """Point each transaction at the booking its invoice number refers to.
+
+    Transactions whose booking no longer exists keep their invoice number without a link.
+    """
+    Booking = apps.get_model('lessons', 'Booking')
+    Transaction = apps.get_model('lessons', 'Transaction')
+    Transaction.objects.filter(invoice_number__in=Booking.objects.values('id')).update(
+        invoice=models.F('invoice_number'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0005_booking_request_indexes'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='transaction',
+            old_name='invoice_id',
+            new_name='invoice_number',
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='invoice',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transactions', to='lessons.booking'),
+        ),
+        migrations.RunPython(link_invoices, migrations.RunPython.noop),
+    ]
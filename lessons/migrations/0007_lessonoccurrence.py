@@ -0,0 +1,60 @@
+# Generated by Django 4.1.3 on 2026-10-17 23:02
+
+import datetime
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+WEEKDAYS = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
+
+
+def generate_occurrences(apps, schema_editor):
+    """Expand every existing booking into its lesson occurrences."""
+    Booking = apps.get_model('lessons', 'Booking')
+    LessonOccurrence = apps.get_model('lessons', 'LessonOccurrence')
+    occurrences = []
+    for booking in Booking.objects.iterator(chunk_size=1000):
+        interval, count, duration = (int(str(value).split()[0]) for value in
+                                     (booking.interval, booking.number_of_lessons, booking.duration))
+        first = booking.start_date + datetime.timedelta(days=(WEEKDAYS.index(booking.day) - booking.start_date.weekday()) % 7)
+        end_time = (datetime.datetime.combine(datetime.date.min, booking.time) + datetime.timedelta(minutes=duration)).time()
+        for lesson in range(count):
+            occurrences.append(LessonOccurrence(booking_id=booking.id, teacher=booking.teacher, start_time=booking.time,
+                                                end_time=end_time, date=first + datetime.timedelta(weeks=interval * lesson)))
+        if len(occurrences) >= 1000:
+            LessonOccurrence.objects.bulk_create(occurrences)
+            occurrences = []
+    LessonOccurrence.objects.bulk_create(occurrences)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0006_transaction_invoice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('teacher', models.CharField(max_length=30)),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lessons', to='lessons.booking')),
+            ],
+            options={
+                'ordering': ['date', 'start_time'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='lessonoccurrence',
+            index=models.Index(fields=['date', 'start_time'], name='lessons_les_date_d8f738_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonoccurrence',
+            index=models.Index(fields=['teacher', 'date'], name='lessons_les_teacher_f7b617_idx'),
+        ),
+        migrations.RunPython(generate_occurrences, migrations.RunPython.noop),
+    ]
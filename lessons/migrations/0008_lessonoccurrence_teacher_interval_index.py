@@ -0,0 +1,21 @@
+# Generated by Django 4.1.3 on 2026-10-17 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0007_lessonoccurrence'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='lessonoccurrence',
+            name='lessons_les_teacher_f7b617_idx',
+        ),
+        migrations.AddIndex(
+            model_name='lessonoccurrence',
+            index=models.Index(fields=['teacher', 'date', 'start_time'], name='lessons_les_teacher_38b976_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations, models
+
+
+def set_academic_years(apps, schema_editor):
+    SchoolTerm = apps.get_model('lessons', 'SchoolTerm')
+    # the academic year runs from September to July
+    SchoolTerm.objects.filter(start_date__month__gte=9).update(academic_year=models.F('start_date__year'))
+    SchoolTerm.objects.filter(start_date__month__lt=9).update(academic_year=models.F('start_date__year') - 1)
+
+
+def add_overlap_constraint(apps, schema_editor):
+    """On Postgres, also let the database reject overlapping terms with a GiST exclusion constraint."""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE lessons_schoolterm ADD CONSTRAINT lessons_schoolterm_no_overlap "
+            "EXCLUDE USING gist (daterange(start_date, end_date, '[]') WITH &&)"
+        )
+
+
+def remove_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE lessons_schoolterm DROP CONSTRAINT lessons_schoolterm_no_overlap")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0009_teacheravailability'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schoolterm',
+            name='academic_year',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(set_academic_years, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='schoolterm',
+            name='academic_year',
+            field=models.PositiveSmallIntegerField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='schoolterm',
+            index=models.Index(fields=['start_date'], name='lessons_sch_start_d_a66f58_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schoolterm',
+            index=models.Index(fields=['end_date'], name='lessons_sch_end_dat_6556a0_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='schoolterm',
+            constraint=models.UniqueConstraint(fields=('academic_year', 'term_number'), name='unique_term_per_academic_year'),
+        ),
+        migrations.RunPython(add_overlap_constraint, remove_overlap_constraint),
+    ]
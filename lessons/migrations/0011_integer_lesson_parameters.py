@@ -0,0 +1,71 @@
+# Generated by Django 4.1.3 on 2026-10-17 23:11
+
+from django.db import migrations, models
+
+LESSON_FIELDS = {
+    'Booking': ['duration', 'interval', 'number_of_lessons'],
+    'Request': ['durationOfLessons', 'intervalBetweenLessons', 'numberOfLessons'],
+}
+
+
+def strip_units(apps, schema_editor):
+    """Reduce values such as '60 Minutes' and '2 WEEKS' to their number so the columns can become integers."""
+    for model_name, fields in LESSON_FIELDS.items():
+        model = apps.get_model('lessons', model_name)
+        for field in fields:
+            for value in model.objects.values_list(field, flat=True).distinct():
+                number = str(value).split()[0]
+                if number != value:
+                    model.objects.filter(**{field: value}).update(**{field: number})
+
+
+def add_units(apps, schema_editor):
+    units = {'duration': ' Minutes', 'durationOfLessons': ' Minutes', 'interval': ' WEEK', 'intervalBetweenLessons': ' WEEK'}
+    for model_name, fields in LESSON_FIELDS.items():
+        model = apps.get_model('lessons', model_name)
+        for field in fields:
+            if field in units:
+                for value in model.objects.values_list(field, flat=True).distinct():
+                    suffix = units[field] + ('S' if units[field] == ' WEEK' and value != '1' else '')
+                    model.objects.filter(**{field: value}).update(**{field: f'{value}{suffix}'})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0010_schoolterm_academic_year'),
+    ]
+
+    operations = [
+        migrations.RunPython(strip_units, add_units),
+        migrations.AlterField(
+            model_name='booking',
+            name='duration',
+            field=models.PositiveSmallIntegerField(choices=[(30, '30 minutes'), (45, '45 minutes'), (60, '60 minutes')]),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='interval',
+            field=models.PositiveSmallIntegerField(choices=[(1, '1 Week'), (2, '2 Weeks')]),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='number_of_lessons',
+            field=models.PositiveSmallIntegerField(choices=[(1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5'), (6, '6'), (7, '7')]),
+        ),
+        migrations.AlterField(
+            model_name='request',
+            name='durationOfLessons',
+            field=models.PositiveSmallIntegerField(choices=[(30, '30 minutes'), (45, '45 minutes'), (60, '60 minutes')]),
+        ),
+        migrations.AlterField(
+            model_name='request',
+            name='intervalBetweenLessons',
+            field=models.PositiveSmallIntegerField(choices=[(1, '1 Week'), (2, '2 Weeks')]),
+        ),
+        migrations.AlterField(
+            model_name='request',
+            name='numberOfLessons',
+            field=models.PositiveSmallIntegerField(choices=[(1, '1'), (2, '2'), (3, '3'), (4, '4'), (5, '5'), (6, '6'), (7, '7')]),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-18 00:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0012_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='payment_made',
+            field=models.DecimalField(blank=True, decimal_places=2, default=0, max_digits=9),
+        ),
+    ]
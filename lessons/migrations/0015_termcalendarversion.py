@@ -0,0 +1,21 @@
+# Generated by Django 4.1.3 on 2026-10-18 00:04
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0014_booking_payment_made_decimal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermCalendarVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.UUIDField(default=uuid.uuid4)),
+            ],
+        ),
+    ]
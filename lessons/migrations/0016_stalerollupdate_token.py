@@ -0,0 +1,19 @@
+# Generated by Django 4.1.3 on 2026-10-18 00:06
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0015_termcalendarversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stalerollupdate',
+            name='token',
+            field=models.UUIDField(default=uuid.uuid4),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-18 00:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lessons', '0016_stalerollupdate_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rollupwatermark',
+            name='version',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
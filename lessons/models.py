@@ -1,3 +1,5 @@
+import uuid
+
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 from django.utils.translation import gettext_lazy as _
@@ -40,6 +42,9 @@ class CustomUser(AbstractUser):
     REQUIRED_FIELDS = ['first_name', 'last_name']
     objects = CustomUserManager()
 
+    # email, first_name and last_name also have case-insensitive search indexes, created by
+    # migration 0004 with the database-specific SQL the admin list's prefix search needs
+
 
 DAY_OF_THE_WEEK = [
     ('MON', "Monday"),
@@ -52,24 +57,24 @@ DAY_OF_THE_WEEK = [
 ]
 
 DURATION = [
-    ('30 Minutes', '30 minutes'),
-    ('45 Minutes', '45 minutes'),
-    ('60 Minutes', '60 minutes')
+    (30, '30 minutes'),
+    (45, '45 minutes'),
+    (60, '60 minutes')
 ]
 
 INTERVAL = [
-    ('1 WEEK', '1 Week'),
-    ('2 WEEKS', '2 Weeks')
+    (1, '1 Week'),
+    (2, '2 Weeks')
 ]
 
 NUMBER_OF_LESSONS = [
-    ('1', '1'),
-    ('2', '2'),
-    ('3', '3'),
-    ('4', '4'),
-    ('5', '5'),
-    ('6', '6'),
-    ('7', '7')
+    (1, '1'),
+    (2, '2'),
+    (3, '3'),
+    (4, '4'),
+    (5, '5'),
+    (6, '6'),
+    (7, '7')
 ]
 
 
@@ -84,33 +89,100 @@ class Child(models.Model):
 
 class Request(models.Model):
     daysAvailable = models.CharField(max_length=7, choices=DAY_OF_THE_WEEK, blank=False)
-    numberOfLessons = models.CharField(max_length=7, choices=NUMBER_OF_LESSONS, blank=False)
-    intervalBetweenLessons = models.CharField(max_length=7, choices=INTERVAL, blank=False)
-    durationOfLessons = models.CharField(max_length=15, choices=DURATION, blank=False)
+    numberOfLessons = models.PositiveSmallIntegerField(choices=NUMBER_OF_LESSONS, blank=False)
+    intervalBetweenLessons = models.PositiveSmallIntegerField(choices=INTERVAL, blank=False)  # weeks
+    durationOfLessons = models.PositiveSmallIntegerField(choices=DURATION, blank=False)  # minutes
     furtherInformation = models.CharField(max_length=100, blank=True, null=True)
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     child = models.ForeignKey(Child, related_name="requests", on_delete=models.CASCADE, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['daysAvailable']),
+        ]
+
+class BookingQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Annotate each booking with its total minutes of lessons and the amount still owed, computed in SQL."""
+        return self.annotate(total_minutes=models.F('duration') * models.F('number_of_lessons'),
+                             outstanding=models.ExpressionWrapper(models.F('full_price') - models.F('payment_made'),
+                                                                  output_field=models.DecimalField()))
+
+
 class Booking(models.Model):
     day = models.CharField(max_length=7, choices=DAY_OF_THE_WEEK, blank=False)
     time = models.TimeField(blank=False)
     teacher = models.CharField(blank=False, max_length=30)
     start_date = models.DateField(blank=False)
-    duration = models.CharField(max_length=15, choices=DURATION, blank=False)
-    interval = models.CharField(max_length=7, choices=INTERVAL, blank=False)
-    number_of_lessons = models.CharField(max_length=7, choices=NUMBER_OF_LESSONS, blank=False)
+    duration = models.PositiveSmallIntegerField(choices=DURATION, blank=False)  # minutes
+    interval = models.PositiveSmallIntegerField(choices=INTERVAL, blank=False)  # weeks
+    number_of_lessons = models.PositiveSmallIntegerField(choices=NUMBER_OF_LESSONS, blank=False)
     price_per_lesson = models.IntegerField(blank=False, default=50)
     full_price = models.IntegerField(blank=True, default=0)
-    payment_made = models.IntegerField(blank=True, default=0)
+    payment_made = models.DecimalField(max_digits=9, decimal_places=2, blank=True, default=0)
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     child = models.ForeignKey(Child, on_delete=models.CASCADE, null=True, blank=True)
+    objects = BookingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['day']),
+            models.Index(fields=['teacher', 'start_date']),
+            models.Index(fields=['start_date']),
+        ]
+
+
+class TeacherAvailability(models.Model):
+    """A weekly time window in which a teacher can be booked for lessons."""
+    teacher = models.CharField(blank=False, max_length=30)
+    day = models.CharField(max_length=7, choices=DAY_OF_THE_WEEK, blank=False)
+    start_time = models.TimeField(blank=False)
+    end_time = models.TimeField(blank=False)
+
+    class Meta:
+        ordering = ['day', 'start_time', 'teacher']
+        verbose_name_plural = 'teacher availability'
+
+    def __str__(self):
+        return f'{self.teacher} {self.get_day_display()} {self.start_time:%H:%M}-{self.end_time:%H:%M}'
+
+
+class LessonOccurrence(models.Model):
+    """A single lesson of a booking, generated from its start date, day, interval and number of lessons."""
+    booking = models.ForeignKey(Booking, related_name="lessons", on_delete=models.CASCADE)
+    teacher = models.CharField(max_length=30)
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    class Meta:
+        ordering = ['date', 'start_time']
+        indexes = [
+            models.Index(fields=['date', 'start_time']),
+            models.Index(fields=['teacher', 'date', 'start_time']),
+        ]
 
 
 class Transaction(models.Model):
-    invoice_id = models.IntegerField(blank=False)
+    # the invoice number paid, kept when the booking it links to is deleted or never existed
+    invoice_number = models.IntegerField()
+    invoice = models.ForeignKey(Booking, related_name="transactions", on_delete=models.SET_NULL, null=True)
     transfer_date = models.DateField(blank=False)
     amount = models.DecimalField(max_digits=6, decimal_places=2, default=0)
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    # the bank's reference of a payment imported from a statement, so a statement line is only applied once
+    reference = models.CharField(max_length=64, unique=True, null=True, blank=True)
+
+    def save(self, *args, **kwargs):
+        if self.invoice_number is None:
+            self.invoice_number = self.invoice_id
+        super().save(*args, **kwargs)
+
+
+class StatementImport(models.Model):
+    """A bank statement file that was imported, identified by the SHA-256 digest of its contents."""
+    digest = models.CharField(max_length=64, unique=True)
+    imported_at = models.DateTimeField(auto_now_add=True)
 
 
 class BankManager(models.Manager):
@@ -139,6 +211,62 @@ class SchoolTerm(models.Model):
     term_number = models.CharField(blank=False, max_length=6, choices=TERMS)
     start_date = models.DateField(blank=False)
     end_date = models.DateField(blank=False)
+    academic_year = models.PositiveSmallIntegerField(editable=False)  # set from start_date before saving
 
     class Meta:
         ordering = ['start_date']
+        indexes = [
+            models.Index(fields=['start_date']),
+            models.Index(fields=['end_date']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['academic_year', 'term_number'], name='unique_term_per_academic_year'),
+        ]
+
+    @staticmethod
+    def academic_year_of(date):
+        """Return the year in which the academic year containing date starts (it runs September to July)."""
+        return date.year if date.month >= 9 else date.year - 1
+
+
+class TermCalendarVersion(models.Model):
+    """A single row whose version changes whenever a school term is saved or deleted."""
+    version = models.UUIDField(default=uuid.uuid4)
+
+
+class DailyRollup(models.Model):
+    """Lessons taught and payments received on one day for one teacher, precomputed by refresh_rollups.
+
+    Payments whose invoice has no booking are counted under a blank teacher.
+    """
+    date = models.DateField()
+    teacher = models.CharField(max_length=30, blank=True)
+    weekday = models.CharField(max_length=7, choices=DAY_OF_THE_WEEK)
+    term = models.ForeignKey(SchoolTerm, related_name="rollups", on_delete=models.SET_NULL, null=True, blank=True)
+    lessons = models.PositiveIntegerField(default=0)
+    lesson_minutes = models.PositiveIntegerField(default=0)
+    payments = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['date', 'teacher']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'teacher'], name='unique_rollup_per_teacher_day'),
+        ]
+
+
+class RollupWatermark(models.Model):
+    """The highest id of a source table already folded into the daily rollups.
+
+    The row of the 'schoolterm' source holds the term calendar version the rollups are labelled with.
+    """
+    source = models.CharField(max_length=30, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    version = models.UUIDField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+
+class StaleRollupDate(models.Model):
+    """A day whose rollups must be recomputed because rows it was built from were changed or deleted."""
+    date = models.DateField(unique=True)
+    token = models.UUIDField(default=uuid.uuid4)  # replaced whenever the day is marked stale again
@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models import F
+
+from lessons.models import Bank, Booking, Transaction
+
+
+class PaymentError(Exception):
+    """Raised when a payment cannot be applied; the message is shown to the student."""
+
+
+def make_payment(user, invoice_id, transfer_date, amount):
+    """Pay an invoice from the user's bank balance and record the transaction.
+
+    The booking row is locked and the balance is checked and deducted by a single conditional
+    UPDATE, so concurrent payments cannot overdraw an account or lose an update to payment_made.
+    Nothing is written unless the whole payment succeeds.
+    """
+    with transaction.atomic():
+        booking = Booking.objects.select_for_update().filter(id=invoice_id).values('payment_made', 'full_price').first()
+        if booking is None:
+            raise PaymentError('ERROR: Invoice ID does not exist')
+        if booking['payment_made'] > booking['full_price']:
+            raise PaymentError('ERROR: Transaction for invoice ID already made')
+        # automatically deduct the price of invoice if there is sufficient amount in balance
+        if not Bank.objects.filter(user=user, balance__gte=amount).update(balance=F('balance') - amount):
+            raise PaymentError('ERROR: Account balance is insufficient')
+        Booking.objects.filter(id=invoice_id).update(payment_made=F('payment_made') + amount)
+        return Transaction.objects.create(invoice_id=invoice_id, transfer_date=transfer_date, amount=amount, user=user)
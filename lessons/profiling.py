@@ -0,0 +1,102 @@
+import contextvars
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+_profile = contextvars.ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """Time spent by one request in SQL, template rendering and auth checks."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.spans = {'template': 0.0, 'auth': 0.0}
+
+    def __call__(self, execute, sql, params, many, context):
+        # a database execute wrapper: count and time every query
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql += time.perf_counter() - started
+
+
+@contextmanager
+def span(name):
+    """Add the time spent in the block to the named span of the request being profiled, if any."""
+    profile = _profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.spans[name] += time.perf_counter() - started
+
+
+class ProfilingMiddleware:
+    """Profile a sample of requests and report where their time went.
+
+    A sampled response gets a Server-Timing header (shown by browser dev tools) and a JSON log line
+    on the lessons.profiling logger. PROFILING_SAMPLE_RATE is the fraction of requests sampled;
+    other requests only pay for one random number.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate <= 0 or random.random() >= rate:
+            return self.get_response(request)
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(profile):
+                response = self.get_response(request)
+        finally:
+            total = time.perf_counter() - started
+            _profile.reset(token)
+        timings = {'sql': profile.sql, **profile.spans, 'total': total}
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={seconds * 1000:.1f}' + (f';desc="{profile.queries} queries"' if name == 'sql' else '')
+            for name, seconds in timings.items())
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': request.resolver_match.view_name if request.resolver_match else None,
+            'status': response.status_code,
+            'queries': profile.queries,
+            **{f'{name}_ms': round(seconds * 1000, 3) for name, seconds in timings.items()},
+        }))
+        return response
+
+
+class ProfiledTemplate(Template):
+    def render(self, context=None, request=None):
+        with span('template'):
+            return super().render(context, request)
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing every render into the template span of the profiled request."""
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return ProfiledTemplate(template.template, self)
@@ -0,0 +1,105 @@
+from django.db.models import Count, DecimalField, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+
+from lessons.helpers import PAGE_SIZE
+from lessons.models import TERMS, Booking, DailyRollup
+
+BALANCE_FILTERS = {
+    'debtors': Q(outstanding__gt=0),
+    'overpaid': Q(outstanding__lt=0),
+    'all': ~Q(outstanding=0),
+}
+ROLLUP_GROUPS = {
+    'month': ['month'],
+    'term': ['term__academic_year', 'term__term_number'],
+    'teacher': ['teacher'],
+    'weekday': ['weekday'],
+}
+# Terms in calendar order rather than by the text of their number, then the holidays
+ROLLUP_ORDER = {
+    'term': [F('term__start_date').asc(nulls_last=True)],
+}
+ROLLUP_SUMMARY_FIELDS = ['period', 'lessons', 'lesson_minutes', 'payments', 'revenue']
+BALANCE_REPORT_FIELDS = ['user_id', 'user__email', 'user__first_name', 'user__last_name', 'child_key',
+                         'child__first_name', 'child__last_name', 'bookings', 'billed', 'paid',
+                         'outstanding']
+
+
+def balances(show='debtors'):
+    """Return the amount each user owes per child, grouped and summed in one query.
+
+    Bookings made for the user themselves are grouped under child_key 0. A positive outstanding
+    amount is owed to the school, a negative one has been overpaid.
+    """
+    return (Booking.objects
+            .annotate(child_key=Coalesce('child_id', 0))
+            .values('user_id', 'child_key', 'user__email', 'user__first_name', 'user__last_name',
+                    'child__first_name', 'child__last_name')
+            .annotate(bookings=Count('id'), billed=Sum('full_price'), paid=Sum('payment_made'),
+                      outstanding=Sum(F('full_price') - F('payment_made'), output_field=DecimalField()))
+            .filter(BALANCE_FILTERS[show])
+            .order_by('user_id', 'child_key'))
+
+
+def balance_page(rows, after=None, page_size=PAGE_SIZE):
+    """Return one page of balances after the (user_id, child_key) key, and the key of the next page.
+
+    Like keyset_page, but on the composite key the balances are grouped by; keys travel as 'user-child'.
+    """
+    if after:
+        user_id, child_key = after
+        rows = rows.filter(Q(user_id__gt=user_id) | Q(user_id=user_id, child_key__gt=child_key))
+    rows = list(rows[:page_size + 1])
+    next_after = None
+    if len(rows) > page_size:
+        last = rows[page_size - 1]
+        next_after = f"{last['user_id']}-{last['child_key']}"
+    return rows[:page_size], next_after
+
+
+def parse_balance_key(value):
+    """Return the (user_id, child_key) pair of a 'user-child' page key, or None if it is malformed."""
+    try:
+        user_id, child_key = (int(part) for part in value.split('-'))
+    except (AttributeError, ValueError):
+        return None
+    return user_id, child_key
+
+
+def balance_rows(rows):
+    """Return the balances as value tuples in BALANCE_REPORT_FIELDS order, for export_lines."""
+    return rows.values_list(*BALANCE_REPORT_FIELDS)
+
+
+def rollup_summary(group_by='month', start=None, end=None):
+    """Return lesson and payment totals per month, term, teacher or weekday, summed from the daily rollups.
+
+    The rollups hold at most one row per teacher and day, so this never scans the lessons or
+    transactions themselves; run refresh_rollups to bring them up to date.
+    """
+    rollups = DailyRollup.objects.order_by()
+    if start:
+        rollups = rollups.filter(date__gte=start)
+    if end:
+        rollups = rollups.filter(date__lte=end)
+    if group_by == 'month':
+        rollups = rollups.annotate(month=TruncMonth('date'))
+    fields = ROLLUP_GROUPS[group_by]
+    rows = (rollups.values(*fields)
+            .annotate(lessons=Sum('lessons'), lesson_minutes=Sum('lesson_minutes'), payments=Sum('payments'),
+                      revenue=Sum('revenue'))
+            .order_by(*ROLLUP_ORDER.get(group_by, fields)))
+    return [dict(row, period=_period(group_by, row)) for row in rows]
+
+
+def _period(group_by, row):
+    if group_by == 'month':
+        return row['month'].strftime('%Y-%m')
+    if group_by == 'term':
+        if row['term__academic_year'] is None:
+            return 'Holidays'
+        year = row['term__academic_year']
+        return f"{year}/{year + 1} term {dict(TERMS)[row['term__term_number']]}"
+    if group_by == 'teacher':
+        return row['teacher'] or 'No booking'
+    return row['weekday']
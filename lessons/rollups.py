@@ -0,0 +1,111 @@
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+
+from lessons.models import (DAY_OF_THE_WEEK, DailyRollup, LessonOccurrence, RollupWatermark, StaleRollupDate,
+                            Transaction)
+from lessons.terms import get_term_calendar
+
+ROLLUP_SOURCES = {
+    'transaction': Transaction,
+    'lessonoccurrence': LessonOccurrence,
+}
+TERMS_SOURCE = 'schoolterm'  # the watermark holding the term calendar version the rollups are labelled with
+ROLLUP_DATE_BATCH_SIZE = 500  # days recomputed per pair of aggregate queries
+# Ids below the watermark scanned again by every refresh. A row can commit after a refresh has read
+# higher ids, if its transaction took its id first; it is folded in as long as fewer than this many
+# ids were taken in between.
+ROLLUP_ID_OVERLAP = 10_000
+
+
+def mark_stale(dates):
+    """Record days whose rollups must be recomputed on the next refresh.
+
+    A day that is already marked gets a new token, so a refresh running meanwhile keeps its mark.
+    """
+    StaleRollupDate.objects.bulk_create([StaleRollupDate(date=date) for date in set(dates)], update_conflicts=True,
+                                        unique_fields=['date'], update_fields=['token'])
+
+
+def mark_bookings_stale(booking_ids):
+    """Record the days holding lessons or payments of the given bookings, before they are changed or deleted."""
+    lesson_dates = LessonOccurrence.objects.filter(booking__in=booking_ids).order_by().values_list('date', flat=True)
+    payment_dates = (Transaction.objects.filter(invoice__in=booking_ids).order_by()
+                     .values_list('transfer_date', flat=True))
+    mark_stale(lesson_dates.union(payment_dates))
+
+
+def refresh_rollups():
+    """Recompute the rollups of the days changed since the last refresh, and return how many days that was.
+
+    A day is changed if a lesson or payment with an id above the source's watermark, less
+    ROLLUP_ID_OVERLAP, falls on it, or if it was marked stale because rows it was built from were
+    edited or deleted. A stale mark is only cleared if it was not marked again during the refresh.
+    Rollups are only moved between terms when the term calendar version has changed.
+    """
+    with transaction.atomic():
+        watermarks = {watermark.source: watermark for watermark in RollupWatermark.objects.select_for_update()
+                      .filter(source__in=[*ROLLUP_SOURCES, TERMS_SOURCE])}
+        stale = list(StaleRollupDate.objects.values_list('id', 'token', 'date'))
+        dates = {date for stale_id, token, date in stale}
+        for source, model in ROLLUP_SOURCES.items():
+            watermark = watermarks.get(source) or RollupWatermark(source=source)
+            last_id = model.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+            date_field = 'transfer_date' if model is Transaction else 'date'
+            first_id = max(watermark.last_id - ROLLUP_ID_OVERLAP, 0)
+            dates.update(model.objects.filter(id__gt=first_id, id__lte=last_id).order_by()
+                         .values_list(date_field, flat=True).distinct())
+            watermark.last_id = last_id
+            watermark.save()
+        dates = sorted(dates)
+        calendar = get_term_calendar()
+        for start in range(0, len(dates), ROLLUP_DATE_BATCH_SIZE):
+            _rebuild_days(dates[start:start + ROLLUP_DATE_BATCH_SIZE], calendar)
+        for start in range(0, len(stale), ROLLUP_DATE_BATCH_SIZE):
+            StaleRollupDate.objects.filter(reduce(or_, (Q(id=stale_id, token=token) for stale_id, token, date
+                                                        in stale[start:start + ROLLUP_DATE_BATCH_SIZE]))).delete()
+        labelled = watermarks.get(TERMS_SOURCE) or RollupWatermark(source=TERMS_SOURCE)
+        # a calendar with no version yet may hold any terms
+        if calendar.version is None or calendar.version != labelled.version:
+            _relabel_terms(calendar)
+            labelled.version = calendar.version
+            labelled.save()
+    return len(dates)
+
+
+def _rebuild_days(dates, calendar):
+    """Replace the rollups of the given days with ones aggregated from the lessons and payments on them."""
+    rollups = {}
+
+    def rollup(date, teacher):
+        if (date, teacher) not in rollups:
+            term = calendar.term_for(date)
+            rollups[date, teacher] = DailyRollup(date=date, teacher=teacher,
+                                                 weekday=DAY_OF_THE_WEEK[date.weekday()][0],
+                                                 term_id=term.id if term else None)
+        return rollups[date, teacher]
+
+    lessons = (LessonOccurrence.objects.filter(date__in=dates).order_by().values('date', 'teacher')
+               .annotate(lessons=Count('id'), lesson_minutes=Sum('booking__duration')))
+    for row in lessons:
+        day = rollup(row['date'], row['teacher'])
+        day.lessons, day.lesson_minutes = row['lessons'], row['lesson_minutes']
+    payments = (Transaction.objects.filter(transfer_date__in=dates).order_by()
+                .values('transfer_date', 'invoice__teacher').annotate(payments=Count('id'), revenue=Sum('amount')))
+    for row in payments:
+        day = rollup(row['transfer_date'], row['invoice__teacher'] or '')
+        day.payments += row['payments']
+        day.revenue += row['revenue']
+    DailyRollup.objects.filter(date__in=dates).delete()
+    DailyRollup.objects.bulk_create(rollups.values(), batch_size=1000)
+
+
+def _relabel_terms(calendar):
+    """Point every rollup at the term its day falls in, after terms were added, moved or deleted."""
+    for term in calendar.terms:
+        DailyRollup.objects.filter(term=term).exclude(date__range=(term.start_date, term.end_date)).update(term=None)
+    for term in calendar.terms:
+        (DailyRollup.objects.filter(date__range=(term.start_date, term.end_date)).exclude(term=term)
+         .update(term=term))
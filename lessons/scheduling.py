@@ -0,0 +1,136 @@
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+
+from lessons.models import DAY_OF_THE_WEEK, Booking, LessonOccurrence, Request, TeacherAvailability
+
+WEEKDAYS = [day for day, name in DAY_OF_THE_WEEK]  # indexed like date.weekday()
+SCHEDULE_FIELDS = {'day', 'time', 'teacher', 'start_date', 'duration', 'interval', 'number_of_lessons'}
+SLOT_STEP_MINUTES = 15  # granularity of the start times tried by the scheduler
+
+
+def lesson_dates(start_date, day, interval_weeks, number_of_lessons):
+    """Return the dates of the lessons: every interval_weeks on day, from the first one on or after start_date."""
+    first = start_date + datetime.timedelta(days=(WEEKDAYS.index(day) - start_date.weekday()) % 7)
+    return [first + datetime.timedelta(weeks=interval_weeks * lesson) for lesson in range(number_of_lessons)]
+
+
+def end_time(start_time, duration_minutes):
+    end = datetime.datetime.combine(datetime.date.min, start_time) + datetime.timedelta(minutes=duration_minutes)
+    return end.time()
+
+
+def booking_occurrences(booking):
+    """Return the unsaved LessonOccurrence rows a booking generates."""
+    # a booking built from raw values may still hold strings rather than a date and a time
+    start_date = Booking._meta.get_field('start_date').to_python(booking.start_date)
+    start_time = Booking._meta.get_field('time').to_python(booking.time)
+    dates = lesson_dates(start_date, booking.day, int(booking.interval), int(booking.number_of_lessons))
+    finish = end_time(start_time, int(booking.duration))
+    return [LessonOccurrence(booking_id=booking.id, teacher=booking.teacher, date=date, start_time=start_time,
+                             end_time=finish)
+            for date in dates]
+
+
+def sync_occurrences(bookings):
+    """Regenerate the lesson occurrences of the given saved bookings with one delete and one bulk insert."""
+    bookings = list(bookings)
+    occurrences = [occurrence for booking in bookings for occurrence in booking_occurrences(booking)]
+    with transaction.atomic():
+        LessonOccurrence.objects.filter(booking__in=[booking.id for booking in bookings]).delete()
+        LessonOccurrence.objects.bulk_create(occurrences, batch_size=1000)
+
+
+def find_conflicts(booking):
+    """Return the other bookings' lessons that clash with the lessons of booking for the same teacher.
+
+    Each candidate lesson is checked with an index range lookup on (teacher, date, start_time), so
+    the cost depends on the number of lessons in the booking rather than on the size of the table.
+    """
+    occurrences = booking_occurrences(booking)
+    if not occurrences:
+        return LessonOccurrence.objects.none()
+    start, finish = occurrences[0].start_time, occurrences[0].end_time
+    clashes = LessonOccurrence.objects.filter(teacher=booking.teacher,
+                                              date__in=[occurrence.date for occurrence in occurrences],
+                                              start_time__lt=finish, end_time__gt=start)
+    if booking.id is not None:
+        clashes = clashes.exclude(booking_id=booking.id)
+    return clashes
+
+
+def lessons_between(start_date, end_date, teacher=None):
+    """Return the lessons taking place from start_date to end_date inclusive, optionally for one teacher."""
+    lessons = LessonOccurrence.objects.filter(date__range=(start_date, end_date))
+    if teacher:
+        lessons = lessons.filter(teacher=teacher)
+    return lessons
+
+
+def _overlaps(busy, start, finish):
+    return any(start < other_finish and other_start < finish for other_start, other_finish in busy)
+
+
+def schedule_requests(requests, start_date, price_per_lesson=50):
+    """Turn pending requests into bookings within the teachers' availability.
+
+    Existing lessons of the available teachers are loaded once, then each request (oldest first) is
+    given the earliest slot on its day whose lessons clash with nothing already booked or scheduled
+    in this run. The new bookings and their lessons are bulk inserted and the fulfilled requests
+    deleted in one transaction. Returns the new bookings and the requests that could not be placed.
+    """
+    with transaction.atomic():
+        requests = list(requests.select_for_update().order_by('id'))
+        windows = defaultdict(list)
+        for window in TeacherAvailability.objects.all():
+            windows[window.day].append(window)
+        plans = {}
+        for request in requests:
+            plans[request.id] = lesson_dates(start_date, request.daysAvailable, int(request.intervalBetweenLessons),
+                                             int(request.numberOfLessons))
+        busy = defaultdict(list)  # (teacher, date) -> [(start_time, end_time)]
+        last_date = max((dates[-1] for dates in plans.values() if dates), default=start_date)
+        teachers = {window.teacher for day_windows in windows.values() for window in day_windows}
+        for teacher, date, start, finish in LessonOccurrence.objects.filter(
+                teacher__in=teachers, date__range=(start_date, last_date)
+        ).values_list('teacher', 'date', 'start_time', 'end_time'):
+            busy[(teacher, date)].append((start, finish))
+
+        bookings = []
+        unscheduled = []
+        for request in requests:
+            booking = _place_request(request, windows[request.daysAvailable], plans[request.id], busy,
+                                     start_date, price_per_lesson)
+            if booking is None:
+                unscheduled.append(request)
+            else:
+                bookings.append(booking)
+        Booking.objects.bulk_create(bookings, batch_size=1000)
+        sync_occurrences(bookings)  # bulk_create does not send post_save
+        Request.objects.filter(id__in=[booking.request_id for booking in bookings]).delete()
+    return bookings, unscheduled
+
+
+def _place_request(request, windows, dates, busy, start_date, price_per_lesson):
+    """Return an unsaved booking in the earliest free slot for request, reserving it in busy."""
+    duration = int(request.durationOfLessons)
+    step = datetime.timedelta(minutes=SLOT_STEP_MINUTES)
+    for window in windows:
+        start = datetime.datetime.combine(datetime.date.min, window.start_time)
+        latest = datetime.datetime.combine(datetime.date.min, window.end_time) - datetime.timedelta(minutes=duration)
+        while start <= latest:
+            start_time, finish = start.time(), end_time(start.time(), duration)
+            if not any(_overlaps(busy[(window.teacher, date)], start_time, finish) for date in dates):
+                for date in dates:
+                    busy[(window.teacher, date)].append((start_time, finish))
+                booking = Booking(day=request.daysAvailable, time=start_time, teacher=window.teacher,
+                                  start_date=start_date, duration=request.durationOfLessons,
+                                  interval=request.intervalBetweenLessons, number_of_lessons=request.numberOfLessons,
+                                  price_per_lesson=price_per_lesson,
+                                  full_price=int(request.numberOfLessons) * price_per_lesson,
+                                  user_id=request.user_id, child_id=request.child_id)
+                booking.request_id = request.id
+                return booking
+            start += step
+    return None
@@ -0,0 +1,324 @@
+import csv
+import datetime
+import io
+import multiprocessing
+import random
+
+import django
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.db import connection, connections, transaction
+from django.db.models import Q
+from faker import Faker
+
+from lessons.models import (DURATION, INTERVAL, NUMBER_OF_LESSONS, Bank, Booking, Child, CustomUser, DailyRollup,
+                            LessonOccurrence, Request, RollupWatermark, SchoolTerm, StaleRollupDate, Transaction)
+from lessons.scheduling import WEEKDAYS, end_time, lesson_dates
+from lessons.terms import invalidate_term_calendar
+
+PROFILES = {
+    'small': 1_000,
+    'medium': 100_000,
+    'large': 2_000_000,
+}
+PASSWORD = 'Password123'
+FIXED_EMAILS = ['john.doe@example.org', 'petra.pickles@example.org', 'jane.smith@example.org',
+                'marty.major@example.org']
+BATCH_SIZE = 5000  # students generated by a worker and loaded in one transaction
+EMAIL = 'student{}@seed.example.org'
+FAKER_SEED = 2022
+NAME_POOL_SIZE = 500  # first and last names drawn for seeded students and teachers
+FIRST_LESSON = datetime.date(2022, 9, 5)  # a Monday
+# Seeded bookings are given a slot of their own so that no teacher is double booked: a teacher teaches
+# one booking per hour, and the same hour again in each following period. A period is long enough for
+# seven lessons two weeks apart that start in its first week.
+LESSON_HOURS = range(8, 18)
+BOOKING_PERIOD = datetime.timedelta(weeks=14)
+BOOKING_PERIODS = 3
+SLOTS_PER_TEACHER = BOOKING_PERIODS * len(WEEKDAYS[:6]) * len(LESSON_HOURS)
+PRICE_PER_LESSON = 50
+
+# The database assigns every id, so workers cannot know them: a generated row refers to its student
+# by email, to the student's child (seeded students have at most one) by the student's email and
+# True, to the student's own booking by the email and False, and is given the ids when it is loaded.
+TABLES = {
+    'users': (CustomUser, ['email', 'password', 'first_name', 'last_name', 'is_staff', 'is_superuser', 'is_active',
+                           'date_joined']),
+    'banks': (Bank, ['user_id', 'balance']),
+    'children': (Child, ['student_id', 'first_name', 'last_name']),
+    'requests': (Request, ['user_id', 'child_id', 'daysAvailable', 'numberOfLessons', 'intervalBetweenLessons',
+                           'durationOfLessons']),
+    'bookings': (Booking, ['user_id', 'child_id', 'day', 'time', 'teacher', 'start_date', 'duration', 'interval',
+                           'number_of_lessons', 'price_per_lesson', 'full_price', 'payment_made']),
+    'lessons': (LessonOccurrence, ['booking_id', 'teacher', 'date', 'start_time', 'end_time']),
+}
+
+# Tables holding users' rows, children before parents, with the path from each row to its user
+UNSEED_TABLES = [
+    (LessonOccurrence, 'booking__user'),
+    (Transaction, 'user'),
+    (Booking, 'user'),
+    (Request, 'user'),
+    (Child, 'student'),
+    (Bank, 'user'),
+    (CustomUser.groups.through, 'customuser'),
+    (CustomUser.user_permissions.through, 'customuser'),
+    (LogEntry, 'user'),
+    (CustomUser, 'pk'),
+]
+# Tables emptied outright: rollups derived from the rows above, and the seeded terms
+CLEARED_TABLES = [DailyRollup, StaleRollupDate, RollupWatermark, SchoolTerm]
+
+_pools = None
+
+
+def _name_pools():
+    """Return the first name, last name and teacher name pools, identical in every worker."""
+    global _pools
+    if _pools is None:
+        faker = Faker('en_AU')
+        faker.seed_instance(FAKER_SEED)
+        first_names = [faker.first_name() for _ in range(NAME_POOL_SIZE)]
+        last_names = [faker.last_name() for _ in range(NAME_POOL_SIZE)]
+        # Teachers are named from the distinct names only, so that no two of them share a name
+        teacher_names = list(dict.fromkeys(first_names)), list(dict.fromkeys(last_names))
+        _pools = first_names, last_names, teacher_names
+    return _pools
+
+
+def max_students():
+    """Return how many students can be seeded before a teacher name would have to be reused."""
+    first_names, last_names = _name_pools()[2]
+    return len(first_names) * len(last_names) * SLOTS_PER_TEACHER // 2
+
+
+def generate_students(first, last, password, date_joined):
+    """Return the rows of students first to last and everything they own, keyed like TABLES.
+
+    Every student is generated from a random generator seeded with its own number, so the rows do not
+    depend on the batch size or on how many workers generated them. Runs in worker processes and does
+    not touch the database.
+    """
+    first_names, last_names, teacher_names = _name_pools()
+    rows = {table: [] for table in TABLES}
+    for number in range(first, last + 1):
+        rng = random.Random(number)
+        email = EMAIL.format(number)
+        rows['users'].append((email, password, rng.choice(first_names), rng.choice(last_names), False, False, True,
+                              date_joined))
+        rows['banks'].append((email, 0))
+        # Same proportions as the seed command's random students
+        has_child = rng.randint(0, 100) >= 30
+        if has_child:
+            rows['children'].append((email, rng.choice(first_names), rng.choice(last_names)))
+        if rng.randint(0, 100) <= 20:
+            rows['requests'].append(_request(rng, email, False))
+        if rng.randint(0, 100) <= 20:
+            _booking(rng, rows, 2 * number - 2, email, False, teacher_names)
+        if has_child:
+            if rng.randint(0, 100) >= 30:
+                _booking(rng, rows, 2 * number - 1, email, True, teacher_names)
+            if rng.randint(0, 100) <= 30:
+                rows['requests'].append(_request(rng, email, True))
+    return rows
+
+
+def _request(rng, email, for_child):
+    return (email, for_child, rng.choice(WEEKDAYS[:6]), rng.choice(NUMBER_OF_LESSONS)[0], rng.choice(INTERVAL)[0],
+            rng.choice(DURATION)[0])
+
+
+def _booking(rng, rows, slot, email, for_child, teacher_names):
+    """Generate the booking holding the given slot, and its lessons, which all fall within the slot's hour."""
+    teacher, slot = divmod(slot, SLOTS_PER_TEACHER)
+    period, slot = divmod(slot, SLOTS_PER_TEACHER // BOOKING_PERIODS)
+    day, hour = divmod(slot, len(LESSON_HOURS))
+    day = WEEKDAYS[day]
+    first_names, last_names = teacher_names
+    last_name, first_name = divmod(teacher, len(first_names))
+    # "First Last", unlike the "Last First" of the seed command's fixed teacher Smith Jane
+    teacher = f'{first_names[first_name]} {last_names[last_name]}'[:30]
+    start_date = FIRST_LESSON + period * BOOKING_PERIOD + datetime.timedelta(days=rng.randint(0, 6))
+    duration, interval = rng.choice(DURATION)[0], rng.choice(INTERVAL)[0]
+    start_time = datetime.time(LESSON_HOURS[hour], rng.choice(range(0, 60 - duration + 1, 15)))
+    number_of_lessons = rng.choice(NUMBER_OF_LESSONS)[0]
+    full_price = number_of_lessons * PRICE_PER_LESSON
+    rows['bookings'].append((email, for_child, day, start_time.isoformat(), teacher, start_date.isoformat(),
+                             duration, interval, number_of_lessons, PRICE_PER_LESSON, full_price,
+                             _payment_made(rng, full_price)))
+    finish = end_time(start_time, duration).isoformat()
+    for date in lesson_dates(start_date, day, interval, number_of_lessons):
+        rows['lessons'].append(((email, for_child), teacher, date.isoformat(), start_time.isoformat(), finish))
+
+
+def _payment_made(rng, full_price):
+    """Return an unpaid, partly paid, fully paid or overpaid amount, like the seed command does."""
+    r = rng.randint(0, 40)
+    if r <= 10:
+        return 0
+    elif r <= 20:
+        return rng.randint(1, full_price)
+    elif r <= 30:
+        return full_price
+    return rng.randint(full_price + 1, full_price + PRICE_PER_LESSON)
+
+
+def _generate_batch(batch):
+    first, last, password, date_joined = batch
+    return first, last, generate_students(first, last, password, date_joined)
+
+
+def bulk_load(model, columns, rows):
+    """Insert rows of column values into the table of model through the backend's fastest bulk path.
+
+    Postgres gets a single COPY; other backends get one executemany of a prepared INSERT. Either way
+    the ORM's per-object work is skipped, so the values must already be in their database form.
+    """
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    names = ', '.join(quote(model._meta.get_field(column).column) for column in columns)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(f'COPY {table} ({names}) FROM STDIN WITH (FORMAT csv)', buffer)
+        else:
+            placeholders = ', '.join(['%s'] * len(columns))
+            cursor.executemany(f'INSERT INTO {table} ({names}) VALUES ({placeholders})', rows)
+
+
+def _load_batch(rows, student_group):
+    """Load one generated batch in a transaction, skipping students that already exist; return how many were new.
+
+    Each table is loaded after the ones it refers to, whose new ids are then read back by student.
+    """
+    emails = [user[0] for user in rows['users']]
+    existing = set(CustomUser.objects.filter(email__in=emails).values_list('email', flat=True))
+    if existing:
+        rows = {table: [row for row in table_rows if _student_email(table, row) not in existing]
+                for table, table_rows in rows.items()}
+    if not rows['users']:
+        return 0
+
+    def load(table, table_rows):
+        model, columns = TABLES[table]
+        bulk_load(model, columns, table_rows)
+
+    with transaction.atomic():
+        load('users', rows['users'])
+        user_ids = dict(CustomUser.objects.filter(email__in=[user[0] for user in rows['users']])
+                        .values_list('email', 'id'))
+        load('banks', [(user_ids[email], *values) for email, *values in rows['banks']])
+        load('children', [(user_ids[email], *values) for email, *values in rows['children']])
+        child_ids = dict(Child.objects.filter(student__in=user_ids.values()).values_list('student_id', 'id'))
+
+        def owners(email, for_child):
+            user_id = user_ids[email]
+            return user_id, child_ids[user_id] if for_child else None
+
+        load('requests', [(*owners(email, for_child), *values) for email, for_child, *values in rows['requests']])
+        load('bookings', [(*owners(email, for_child), *values) for email, for_child, *values in rows['bookings']])
+        booking_ids = {(user_id, child_id is not None): booking_id for booking_id, user_id, child_id
+                       in Booking.objects.filter(user__in=user_ids.values()).values_list('id', 'user_id', 'child_id')}
+        load('lessons', [(booking_ids[user_ids[email], for_child], *values)
+                         for (email, for_child), *values in rows['lessons']])
+        bulk_load(CustomUser.groups.through, ['customuser_id', 'group_id'],
+                  [(user_id, student_group.id) for user_id in user_ids.values()])
+    return len(user_ids)
+
+
+def _student_email(table, row):
+    """Return the email of the student a generated row belongs to."""
+    return row[0][0] if table == 'lessons' else row[0]
+
+
+def _init_worker():
+    # Workers started with spawn rather than fork must set Django up themselves
+    django.setup()
+
+
+def seed_students(count, batch_size=BATCH_SIZE, workers=1, progress=None):
+    """Seed students 1 to count with everything they own, and return how many were new.
+
+    Batches are generated in parallel by worker processes and loaded in order by this one, so the
+    database sees a single writer and the dataset is the same whatever the number of workers.
+    """
+    if count > max_students():
+        raise ValueError(f'Cannot seed more than {max_students()} students without double booking a teacher')
+    student_group, _ = Group.objects.get_or_create(name='Student')
+    # One PBKDF2 hash shared by every student instead of one per user
+    password = make_password(PASSWORD)
+    date_joined = CustomUser._meta.get_field('date_joined').get_db_prep_save(
+        datetime.datetime(2022, 9, 1, tzinfo=datetime.timezone.utc), connection)
+    batches = [(first, min(first + batch_size - 1, count), password, date_joined)
+               for first in range(1, count + 1, batch_size)]
+    created = 0
+    if workers > 1:
+        connections.close_all()  # forked workers must not share the parent's connection
+        with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+            for first, last, rows in pool.imap(_generate_batch, batches):
+                created += _load_batch(rows, student_group)
+                if progress:
+                    progress(last, count)
+    else:
+        for first, last, rows in map(_generate_batch, batches):
+            created += _load_batch(rows, student_group)
+            if progress:
+                progress(last, count)
+    return created
+
+
+def unseed(keep_fixed=False):
+    """Delete every student and everything they own, keeping staff, superusers and optionally the fixed accounts.
+
+    Rows are removed table by table with set-based statements, children before parents, instead of
+    being collected and deleted one by one through the ORM. On Postgres the tables are truncated
+    together and the few kept rows copied back. Neither sends delete signals, so the term calendar
+    is invalidated here.
+    """
+    kept = Q(is_staff=True) | Q(is_superuser=True)
+    if keep_fixed:
+        kept |= Q(email__in=FIXED_EMAILS)
+    with transaction.atomic():
+        # a kept user's payment against a deleted booking keeps its invoice number but loses the link
+        Transaction.objects.filter(user__in=CustomUser.objects.filter(kept)).exclude(
+            invoice__user__in=CustomUser.objects.filter(kept)).exclude(invoice=None).update(invoice=None)
+        if connection.vendor == 'postgresql':
+            _truncate_keeping(CustomUser.objects.filter(kept).values('pk'))
+        else:
+            doomed = CustomUser.objects.exclude(kept).values('pk')
+            for model, owner in UNSEED_TABLES:
+                _delete(model.objects.filter(**{f'{owner}__in': doomed}))
+            for model in CLEARED_TABLES:
+                _delete(model.objects.all())
+        invalidate_term_calendar()
+
+
+def _delete(queryset):
+    """Delete the rows of queryset with one DELETE statement, without loading them or sending signals."""
+    quote = connection.ops.quote_name
+    meta = queryset.model._meta
+    pk_sql, params = queryset.values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {quote(meta.db_table)} WHERE {quote(meta.pk.column)} IN ({pk_sql})', params)
+
+
+def _truncate_keeping(kept_users):
+    """Truncate the unseeded and cleared tables in one statement, restoring the rows of kept_users."""
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for model, owner in UNSEED_TABLES:
+            table = model._meta.db_table
+            keep_sql, params = model.objects.filter(**{f'{owner}__in': kept_users}).values('pk').query.sql_with_params()
+            cursor.execute(f'CREATE TEMPORARY TABLE {quote("keep_" + table)} ON COMMIT DROP AS '
+                           f'SELECT * FROM {quote(table)} WHERE {quote(model._meta.pk.column)} IN ({keep_sql})', params)
+        tables = [model._meta.db_table for model, owner in UNSEED_TABLES] + [model._meta.db_table
+                                                                            for model in CLEARED_TABLES]
+        cursor.execute(f'TRUNCATE {", ".join(quote(table) for table in tables)}')
+        for model, owner in reversed(UNSEED_TABLES):
+            table = model._meta.db_table
+            cursor.execute(f'INSERT INTO {quote(table)} SELECT * FROM {quote("keep_" + table)}')
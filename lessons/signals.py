@@ -0,0 +1,58 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from lessons.models import Booking, CustomUser, SchoolTerm, Transaction
+from lessons.rollups import mark_bookings_stale, mark_stale
+from lessons.scheduling import SCHEDULE_FIELDS, sync_occurrences
+from lessons.terms import invalidate_term_calendar
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def user_groups_changed(sender, instance, action, reverse, **kwargs):
+    """Drop the group names memoized on a user whose group membership changes."""
+    if not reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        instance.__dict__.pop('_group_names', None)
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, update_fields=None, **kwargs):
+    """Keep the booking's lesson occurrences in step with its schedule."""
+    if update_fields is not None and not SCHEDULE_FIELDS.intersection(update_fields):
+        return
+    if not kwargs.get('created'):
+        mark_bookings_stale([instance.id])
+    sync_occurrences([instance])
+
+
+@receiver(pre_delete, sender=Booking)
+def booking_deleting(sender, instance, **kwargs):
+    mark_bookings_stale([instance.id])
+
+
+@receiver(pre_save, sender=Transaction)
+def transaction_saving(sender, instance, raw=False, **kwargs):
+    """Mark the old and new day of an edited payment stale; new payments are found by the rollup watermark."""
+    if raw or instance.pk is None:
+        return
+    old_date = Transaction.objects.filter(pk=instance.pk).values_list('transfer_date', flat=True).first()
+    if old_date is not None:
+        new_date = Transaction._meta.get_field('transfer_date').to_python(instance.transfer_date)
+        mark_stale([old_date, new_date])
+
+
+@receiver(post_delete, sender=Transaction)
+def transaction_deleted(sender, instance, **kwargs):
+    mark_stale([instance.transfer_date])
+
+
+@receiver(pre_save, sender=SchoolTerm)
+def school_term_saving(sender, instance, **kwargs):
+    # also runs for fixtures, which are saved without calling SchoolTerm.save()
+    start_date = SchoolTerm._meta.get_field('start_date').to_python(instance.start_date)
+    instance.academic_year = SchoolTerm.academic_year_of(start_date)
+
+
+@receiver(post_save, sender=SchoolTerm)
+@receiver(post_delete, sender=SchoolTerm)
+def school_term_changed(sender, **kwargs):
+    invalidate_term_calendar()
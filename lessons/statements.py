@@ -0,0 +1,150 @@
+import codecs
+import csv
+import datetime
+import hashlib
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, DecimalField, F, Value, When
+
+from lessons.exports import csv_safe
+from lessons.models import Booking, StatementImport, Transaction
+
+STATEMENT_BATCH_SIZE = 1000  # statement rows matched and applied per transaction
+STATEMENT_FIELDS = ['invoice_id', 'date', 'amount', 'reference']  # reference is optional
+REJECT_FIELDS = STATEMENT_FIELDS + ['reason']
+STATEMENT_ENCODING = 'utf-8-sig'
+CENT = Decimal('0.01')
+_amount_field = Transaction._meta.get_field('amount')
+# the first amount too large for Transaction.amount
+AMOUNT_LIMIT = Decimal(10) ** (_amount_field.max_digits - _amount_field.decimal_places)
+REFERENCE_LENGTH = Transaction._meta.get_field('reference').max_length
+
+
+class StatementAlreadyImported(Exception):
+    pass
+
+
+def is_utf8(statement):
+    """Return whether the binary statement file decodes as UTF-8, and rewind it."""
+    decoder = codecs.getincrementaldecoder(STATEMENT_ENCODING)()
+    try:
+        for chunk in iter(lambda: statement.read(64 * 1024), b''):
+            decoder.decode(chunk)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return False
+    finally:
+        statement.seek(0)
+    return True
+
+
+def statement_digest(statement):
+    """Return the SHA-256 digest of the binary statement file, and rewind it."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: statement.read(64 * 1024), b''):
+        digest.update(chunk)
+    statement.seek(0)
+    return digest.hexdigest()
+
+
+def read_statement(lines):
+    """Return the rows of a CSV bank statement with invoice_id, date and amount columns."""
+    return csv.DictReader(lines)
+
+
+def _parse_row(row):
+    """Return (invoice_id, transfer_date, amount, reference) for a statement row, or raise ValueError."""
+    try:
+        invoice_id = int(row.get('invoice_id') or '')
+        transfer_date = datetime.date.fromisoformat((row.get('date') or '').strip())
+        amount = Decimal((row.get('amount') or '').strip())
+    except (ValueError, InvalidOperation):
+        raise ValueError('malformed row')
+    if not amount.is_finite():
+        raise ValueError('malformed row')
+    if amount <= 0:
+        raise ValueError('amount must be positive')
+    if amount >= AMOUNT_LIMIT:
+        raise ValueError('amount out of range')
+    if amount != amount.quantize(CENT):
+        raise ValueError('more than 2 decimal places')
+    reference = (row.get('reference') or '').strip() or None
+    if reference and len(reference) > REFERENCE_LENGTH:
+        raise ValueError('reference too long')
+    return invoice_id, transfer_date, amount, reference
+
+
+def import_statement(rows, batch_size=STATEMENT_BATCH_SIZE, digest=None):
+    """Record the payments of a bank statement against the bookings they pay.
+
+    Rows are matched to bookings with one query per batch, and each batch is applied in its own
+    transaction: its Transaction rows are bulk inserted and every booking's payment_made is
+    increased by a single UPDATE. A row whose bank reference was already imported is rejected as a
+    duplicate; rows without a reference are all applied, as identical payments can be genuine. If
+    the statement file's digest is given, a file imported before raises StatementAlreadyImported.
+    Returns the number of imported rows and a list of the rejected rows, each with a reason.
+    """
+    if digest is not None:
+        try:
+            with transaction.atomic():
+                StatementImport.objects.create(digest=digest)
+        except IntegrityError:
+            raise StatementAlreadyImported('This statement has already been imported.')
+    imported = 0
+    rejected = []
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        payments = []
+        for row in batch:
+            try:
+                payments.append(_parse_row(row))
+            except ValueError as error:
+                rejected.append(_reject(row, str(error)))
+        invoice_ids = {payment[0] for payment in payments}
+        with transaction.atomic():
+            # lock the batch's bookings so a concurrent import of the same statement waits for this one
+            booking_users = dict(Booking.objects.select_for_update().filter(id__in=invoice_ids)
+                                 .values_list('id', 'user_id'))
+            references = {payment[3] for payment in payments if payment[3]}
+            recorded = set(Transaction.objects.filter(reference__in=references).values_list('reference', flat=True))
+            new_transactions = []
+            totals = {}
+            for invoice_id, transfer_date, amount, reference in payments:
+                reason = None
+                if invoice_id not in booking_users:
+                    reason = 'unknown invoice'
+                elif reference in recorded:
+                    reason = 'duplicate payment'
+                if reason:
+                    rejected.append(_reject({'invoice_id': invoice_id, 'date': transfer_date, 'amount': amount,
+                                             'reference': reference}, reason))
+                    continue
+                if reference:
+                    recorded.add(reference)
+                new_transactions.append(Transaction(invoice_number=invoice_id, invoice_id=invoice_id,
+                                                    transfer_date=transfer_date, amount=amount,
+                                                    user_id=booking_users[invoice_id], reference=reference))
+                totals[invoice_id] = totals.get(invoice_id, 0) + amount
+            if new_transactions:
+                Transaction.objects.bulk_create(new_transactions)
+                Booking.objects.filter(id__in=totals).update(payment_made=F('payment_made') + Case(
+                    *[When(id=invoice_id, then=Value(total)) for invoice_id, total in totals.items()],
+                    output_field=DecimalField(),
+                ))
+        imported += len(new_transactions)
+    return imported, rejected
+
+
+def _reject(row, reason):
+    return {**{field: row.get(field) for field in STATEMENT_FIELDS}, 'reason': reason}
+
+
+def write_rejects(rejected, output):
+    writer = csv.DictWriter(output, fieldnames=REJECT_FIELDS)
+    writer.writeheader()
+    writer.writerows({field: csv_safe(value) for field, value in row.items()} for row in rejected)
@@ -1,7 +1,9 @@
 from django import template
 
-register = template.Library() 
+from lessons.helpers import get_user_groups
 
-@register.filter(name='has_group') 
+register = template.Library()
+
+@register.filter(name='has_group')
 def has_group(user, group_name):
-    return user.groups.filter(name=group_name).exists()
\ No newline at end of file
+    return group_name in get_user_groups(user)
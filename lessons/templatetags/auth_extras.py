@@ -1,8 +1,10 @@
 from django import template
 
+from lessons.helpers import get_user_groups
+
 register = template.Library()
 
 
 @register.filter(name='has_group')
 def has_group(user, group_name):
-    return user.groups.filter(name=group_name).exists()
+    return group_name in get_user_groups(user)
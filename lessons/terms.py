@@ -0,0 +1,81 @@
+import bisect
+import threading
+import time
+import uuid
+
+from django.db import transaction
+
+from lessons.models import SchoolTerm, TermCalendarVersion
+
+
+VERSION_CHECK_SECONDS = 5  # how long a process trusts its term calendar before checking the version again
+
+
+class TermCalendar:
+    """The school terms sorted by start date, searched with bisect."""
+
+    def __init__(self, terms, version=None):
+        self.terms = sorted(terms, key=lambda term: term.start_date)
+        self.start_dates = [term.start_date for term in self.terms]
+        self.version = version  # of the terms it was built from
+
+    def term_for(self, date):
+        """Return the term containing date, or None if it falls outside every term."""
+        index = bisect.bisect_right(self.start_dates, date) - 1
+        if index >= 0 and date <= self.terms[index].end_date:
+            return self.terms[index]
+        return None
+
+    def is_holiday(self, date):
+        return self.term_for(date) is None
+
+
+_calendar = None
+_checked_at = None
+_calendar_lock = threading.Lock()
+
+
+def _current_version():
+    return TermCalendarVersion.objects.filter(pk=1).values_list('version', flat=True).first()
+
+
+def get_term_calendar():
+    """Return this process's term calendar, rebuilding it if a term has changed since it was built.
+
+    Lookups run no query: the version row is read at most once every VERSION_CHECK_SECONDS, and the
+    terms themselves only after a term was saved or deleted, so another process's change is seen
+    within that time. This process's own changes are seen at once.
+    """
+    global _calendar, _checked_at
+    now = time.monotonic()
+    if _calendar is not None and now - _checked_at < VERSION_CHECK_SECONDS:
+        return _calendar
+    with _calendar_lock:
+        if _calendar is None or now - _checked_at >= VERSION_CHECK_SECONDS:
+            version = _current_version()
+            if _calendar is None or version != _calendar.version:
+                _calendar = TermCalendar(SchoolTerm.objects.all(), version)
+            _checked_at = now
+    return _calendar
+
+
+def _bump_version():
+    TermCalendarVersion.objects.update_or_create(pk=1, defaults={'version': uuid.uuid4()})
+
+
+def invalidate_term_calendar():
+    """Make every process rebuild its term calendar once the current transaction commits.
+
+    This process's calendar is dropped at once, so it sees its own changes straight away.
+    """
+    global _calendar
+    _calendar = None
+    transaction.on_commit(_bump_version)
+
+
+def term_for(date):
+    return get_term_calendar().term_for(date)
+
+
+def is_holiday(date):
+    return get_term_calendar().is_holiday(date)
@@ -0,0 +1,57 @@
+import datetime
+from django.test import TestCase
+from lessons.forms import BookingForm
+from lessons.models import Booking, CustomUser as User
+
+
+class BookingFormTestCase(TestCase):
+    fixtures = ['lessons/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.user = User.objects.get(pk=1)
+        self.booking = Booking.objects.create(day='FRI', time=datetime.time(16, 0), teacher='Smith Jane',
+                                              start_date=datetime.date(2022, 12, 2), duration=60,
+                                              interval=2, number_of_lessons=6, user=self.user)
+        self.form_input = {
+            'day': 'FRI',
+            'time': '16:30',
+            'teacher': 'Smith Jane',
+            'start_date': '2022-12-16',
+            'duration': 30,
+            'interval': 1,
+            'number_of_lessons': '2',
+            'price_per_lesson': '50',
+        }
+
+    def test_form_rejects_teacher_double_booking(self):
+        form = BookingForm(data=self.form_input)
+        self.assertFalse(form.is_valid())
+        self.assertIn('Smith Jane already has a lesson on 16/12/2022 from 16:00 to 17:00.', form.errors['time'])
+
+    def test_form_accepts_adjacent_lesson(self):
+        self.form_input['time'] = '17:00'
+        form = BookingForm(data=self.form_input)
+        self.assertTrue(form.is_valid())
+
+    def test_form_accepts_other_teacher_in_same_slot(self):
+        self.form_input['teacher'] = 'Green Tom'
+        form = BookingForm(data=self.form_input)
+        self.assertTrue(form.is_valid())
+
+    def test_form_accepts_lessons_in_weeks_without_a_clash(self):
+        self.form_input['start_date'] = '2022-12-09'
+        self.form_input['interval'] = 2
+        form = BookingForm(data=self.form_input)
+        self.assertTrue(form.is_valid())
+
+    def test_editing_a_booking_does_not_clash_with_itself(self):
+        self.form_input['start_date'] = '2022-12-02'
+        form = BookingForm(data=self.form_input, instance=self.booking)
+        self.assertTrue(form.is_valid())
+
+    def test_save_sets_full_price(self):
+        self.form_input['teacher'] = 'Green Tom'
+        form = BookingForm(data=self.form_input)
+        booking = form.save(self.user)
+        self.assertEqual(booking.full_price, 100)
+        self.assertEqual(booking.lessons.count(), 2)
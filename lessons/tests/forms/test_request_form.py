@@ -9,8 +9,8 @@ class RequestFormTestCase(TestCase):
         self.user=User.objects.get(pk=1)
         self.form_input = {'daysAvailable': 'MON',
                            'numberOfLessons': '2',
-                           'intervalBetweenLessons': '1 WEEK',
-                           'durationOfLessons': '30 Minutes',
+                           'intervalBetweenLessons': 1,
+                           'durationOfLessons': 30,
                            'furtherInformation': 'maths'
                            }
 
@@ -83,3 +83,13 @@ class SchoolTermFormTestCase(TestCase):
         self.assertEqual(term.start_date, datetime.date(2022, 10, 31))
         self.assertEqual(term.end_date, datetime.date(2022, 12, 16))
         self.assertEqual(term.term_number, 'two')
+
+    def test_editing_a_term_does_not_overlap_with_itself(self):
+        term = SchoolTerm.objects.get(id=1)
+        form = SchoolTermForm(data={'term_number': 'one', 'start_date': datetime.date(2022, 9, 5),
+                                    'end_date': datetime.date(2022, 10, 21)}, instance=term)
+        self.assertTrue(form.is_valid())
+
+    def test_validation_uses_a_fixed_number_of_queries(self):
+        with self.assertNumQueries(2):
+            SchoolTermForm(data=self.form_input).is_valid()
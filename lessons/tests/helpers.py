@@ -1,6 +1,29 @@
+import json
+from pathlib import Path
+
 from django.test import TestCase
 
 class LogInTester(TestCase):
     def _is_logged_in(self):
         return '_auth_user_id' in self.client.session.keys()  # dictionary that contain all session data. (.keys())
         # will get list with all keys. return true if exist. false if none
+
+
+class QueryBudgetTester(TestCase):
+    """Assertions on the number of queries a view runs, against the budgets in query_budgets.json.
+
+    Lower a budget when a view gets cheaper; raising one needs a reason in the commit that does it.
+    """
+    budget_file = Path(__file__).resolve().parent / 'query_budgets.json'
+
+    @classmethod
+    def query_budgets(cls):
+        with open(cls.budget_file) as budgets:
+            return json.load(budgets)
+
+    def assertWithinQueryBudget(self, name, queries):
+        budget = self.query_budgets()[name]
+        self.assertLessEqual(queries, budget, f'{name} ran {queries} queries, over its budget of {budget}')
+
+    def assertQueriesDoNotGrow(self, name, small, large):
+        self.assertEqual(large, small, f'{name} ran {small} queries on the small dataset but {large} on the large one')
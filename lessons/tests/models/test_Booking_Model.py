@@ -1,4 +1,5 @@
 from django.test import TestCase 
+from django.db.models import F, Sum
 from lessons.models import Booking
 from django.core.exceptions import ValidationError
 from lessons.models import Child, CustomUser as User
@@ -24,9 +25,9 @@ class BookingModelTest(TestCase):
             time = '09:00',
             teacher = 'Mr Green',
             start_date = '2022-12-01',
-            number_of_lessons = '2',
-            interval =  '1 WEEK',
-            duration = '30 Minutes',
+            number_of_lessons = 2,
+            interval =  1,
+            duration = 30,
             price_per_lesson = '50',
             full_price = '10',
             user = self.user,
@@ -104,4 +105,20 @@ class BookingModelTest(TestCase):
 
     def test_child_should_be_correct(self):
         givenChild = self.booking_user.child
-        self.assertEqual(self.child, givenChild)
\ No newline at end of file
+        self.assertEqual(self.child, givenChild)
+    def test_duration_must_be_one_of_the_choices(self):
+        self.booking_user.duration = 50
+        with self.assertRaises(ValidationError):
+            self.booking_user.full_clean()
+
+    def test_duration_keeps_its_display_label(self):
+        self.assertEqual(self.booking_user.get_duration_display(), '30 minutes')
+
+    def test_with_totals_computes_minutes_and_outstanding_in_sql(self):
+        booking = Booking.objects.with_totals().get(pk=self.booking_user.pk)
+        self.assertEqual(booking.total_minutes, 60)
+        self.assertEqual(booking.outstanding, 10)
+
+    def test_full_price_can_be_summed_from_lesson_parameters(self):
+        total = Booking.objects.aggregate(total=Sum(F('price_per_lesson') * F('number_of_lessons')))['total']
+        self.assertEqual(total, 100)
@@ -0,0 +1,53 @@
+import datetime
+from django.test import TestCase
+from lessons.models import Booking, LessonOccurrence, CustomUser as User
+from lessons.scheduling import lessons_between
+
+
+class LessonOccurrenceModelTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            first_name='John',
+            last_name='Doe',
+            email='johndoe@example.org',
+            password='Password123',
+        )
+        self.booking = Booking.objects.create(
+            day='FRI',
+            time=datetime.time(16, 0),
+            teacher='Smith Jane',
+            start_date=datetime.date(2022, 12, 1),
+            number_of_lessons=3,
+            interval=2,
+            duration=45,
+            user=self.user)
+
+    def test_occurrences_are_generated_for_new_booking(self):
+        lessons = list(self.booking.lessons.values_list('date', 'start_time', 'end_time', 'teacher'))
+        self.assertEqual(lessons, [
+            (datetime.date(2022, 12, 2), datetime.time(16, 0), datetime.time(16, 45), 'Smith Jane'),
+            (datetime.date(2022, 12, 16), datetime.time(16, 0), datetime.time(16, 45), 'Smith Jane'),
+            (datetime.date(2022, 12, 30), datetime.time(16, 0), datetime.time(16, 45), 'Smith Jane'),
+        ])
+
+    def test_occurrences_follow_booking_edits(self):
+        self.booking.teacher = 'Green Tom'
+        self.booking.number_of_lessons = 1
+        self.booking.save()
+        self.assertEqual(list(LessonOccurrence.objects.values_list('date', 'teacher')),
+                         [(datetime.date(2022, 12, 2), 'Green Tom')])
+
+    def test_occurrences_are_deleted_with_booking(self):
+        self.booking.delete()
+        self.assertFalse(LessonOccurrence.objects.exists())
+
+    def test_payment_updates_do_not_regenerate_occurrences(self):
+        ids = set(self.booking.lessons.values_list('id', flat=True))
+        self.booking.payment_made = 50
+        self.booking.save(update_fields=['payment_made'])
+        self.assertEqual(set(self.booking.lessons.values_list('id', flat=True)), ids)
+
+    def test_lessons_between(self):
+        lessons = lessons_between(datetime.date(2022, 12, 10), datetime.date(2022, 12, 31), teacher='Smith Jane')
+        self.assertEqual(lessons.count(), 2)
+        self.assertFalse(lessons_between(datetime.date(2022, 12, 10), datetime.date(2022, 12, 31), teacher='Other').exists())
@@ -13,9 +13,9 @@ class RequestModelTest(TestCase):
         )
         self.request_user = RequestTestCase.objects.create(
             daysAvailable='MON',
-            numberOfLessons='2',
-            intervalBetweenLessons='1 WEEK',
-            durationOfLessons='30 Minutes',
+            numberOfLessons=2,
+            intervalBetweenLessons=1,
+            durationOfLessons=30,
             furtherInformation='Piano, Mr Green',
             user=self.user, )
 
@@ -0,0 +1,166 @@
+import datetime
+import uuid
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+from lessons.models import (Booking, CustomUser, DailyRollup, RollupWatermark, SchoolTerm, StaleRollupDate,
+                            TermCalendarVersion, Transaction)
+from lessons.reports import rollup_summary
+from lessons import rollups, terms
+from lessons.rollups import mark_stale, refresh_rollups
+
+
+class DailyRollupTest(TestCase):
+    fixtures = ['lessons/tests/fixtures/default_user.json', 'lessons/tests/fixtures/school_terms.json']
+
+    def setUp(self):
+        terms.invalidate_term_calendar()
+        self.user = CustomUser.objects.get(email='johndoe@example.org')
+        # two weekly 45 minute lessons on Mondays 5 and 12 December 2022
+        self.booking = Booking.objects.create(day='MON', time='09:00', teacher='Mr Green', start_date='2022-12-05',
+                                              duration=45, interval=1, number_of_lessons=2, full_price=100,
+                                              user=self.user)
+        Transaction.objects.create(invoice=self.booking, transfer_date=datetime.date(2022, 12, 5), amount=60,
+                                   user=self.user)
+        # a payment of an invoice with no booking
+        Transaction.objects.create(invoice_number=999, transfer_date=datetime.date(2022, 12, 5), amount=15,
+                                   user=self.user)
+
+    def _rollups(self):
+        return [(rollup.date, rollup.teacher, rollup.lessons, rollup.lesson_minutes, rollup.payments, rollup.revenue)
+                for rollup in DailyRollup.objects.all()]
+
+    def test_refresh_builds_daily_totals_per_teacher(self):
+        self.assertEqual(refresh_rollups(), 2)
+        self.assertEqual(self._rollups(), [
+            (datetime.date(2022, 12, 5), '', 0, 0, 1, Decimal('15')),
+            (datetime.date(2022, 12, 5), 'Mr Green', 1, 45, 1, Decimal('60')),
+            (datetime.date(2022, 12, 12), 'Mr Green', 1, 45, 0, Decimal('0')),
+        ])
+        self.assertEqual(DailyRollup.objects.first().weekday, 'MON')
+
+    @mock.patch('lessons.rollups.ROLLUP_ID_OVERLAP', 0)
+    def test_refresh_only_recomputes_changed_days(self):
+        refresh_rollups()
+        self.assertEqual(refresh_rollups(), 0)
+        Transaction.objects.create(invoice=self.booking, transfer_date=datetime.date(2022, 12, 12), amount=40,
+                                   user=self.user)
+        self.assertEqual(refresh_rollups(), 1)
+        self.assertEqual(DailyRollup.objects.get(date=datetime.date(2022, 12, 12)).revenue, Decimal('40'))
+
+    def test_refresh_picks_up_rows_committed_below_the_watermark(self):
+        refresh_rollups()
+        # as if a transaction that took the next ids committed after the refresh read the ids above them
+        RollupWatermark.objects.filter(source='transaction').update(last_id=F('last_id') + 5)
+        Transaction.objects.create(invoice=self.booking, transfer_date=datetime.date(2022, 12, 12), amount=40,
+                                   user=self.user)
+        refresh_rollups()
+        self.assertEqual(DailyRollup.objects.get(date=datetime.date(2022, 12, 12)).revenue, Decimal('40'))
+
+    def test_day_marked_stale_during_a_refresh_stays_marked(self):
+        mark_stale([datetime.date(2022, 12, 5)])
+        rebuild_days = rollups._rebuild_days
+
+        def rebuild_and_mark(dates, calendar):
+            rebuild_days(dates, calendar)
+            mark_stale([datetime.date(2022, 12, 5)])  # a change made while the refresh runs
+
+        with mock.patch('lessons.rollups._rebuild_days', rebuild_and_mark):
+            refresh_rollups()
+        self.assertEqual(list(StaleRollupDate.objects.values_list('date', flat=True)), [datetime.date(2022, 12, 5)])
+        refresh_rollups()
+        self.assertFalse(StaleRollupDate.objects.exists())
+
+    def test_rescheduled_booking_recomputes_its_old_days(self):
+        refresh_rollups()
+        self.booking.start_date = datetime.date(2022, 12, 7)
+        self.booking.day = 'WED'
+        self.booking.teacher = 'Ms Brown'
+        self.booking.save()
+        refresh_rollups()
+        self.assertEqual(self._rollups(), [
+            (datetime.date(2022, 12, 5), '', 0, 0, 1, Decimal('15')),
+            (datetime.date(2022, 12, 5), 'Ms Brown', 0, 0, 1, Decimal('60')),
+            (datetime.date(2022, 12, 7), 'Ms Brown', 1, 45, 0, Decimal('0')),
+            (datetime.date(2022, 12, 14), 'Ms Brown', 1, 45, 0, Decimal('0')),
+        ])
+        self.assertFalse(StaleRollupDate.objects.exists())
+
+    def test_deleted_booking_and_transaction_are_removed(self):
+        refresh_rollups()
+        Transaction.objects.get(invoice=None).delete()
+        self.booking.delete()
+        refresh_rollups()
+        self.assertEqual(self._rollups(), [(datetime.date(2022, 12, 5), '', 0, 0, 1, Decimal('60'))])
+
+    def test_rollups_follow_term_changes(self):
+        refresh_rollups()
+        self.assertIsNone(DailyRollup.objects.first().term)
+        term = SchoolTerm.objects.create(term_number='two', start_date=datetime.date(2022, 10, 31),
+                                         end_date=datetime.date(2022, 12, 9))
+        refresh_rollups()
+        self.assertEqual(DailyRollup.objects.filter(term=term).count(), 2)
+        term.end_date = datetime.date(2022, 12, 2)
+        term.save()
+        refresh_rollups()
+        self.assertFalse(DailyRollup.objects.filter(term=term).exists())
+
+    @mock.patch('lessons.rollups.ROLLUP_ID_OVERLAP', 0)
+    def test_edited_transaction_recomputes_its_old_and_new_days(self):
+        refresh_rollups()
+        payment = Transaction.objects.get(invoice=self.booking)
+        payment.transfer_date = datetime.date(2022, 12, 12)
+        payment.amount = 45
+        payment.save()
+        self.assertEqual(refresh_rollups(), 2)
+        self.assertEqual(self._rollups(), [
+            (datetime.date(2022, 12, 5), '', 0, 0, 1, Decimal('15')),
+            (datetime.date(2022, 12, 5), 'Mr Green', 1, 45, 0, Decimal('0')),
+            (datetime.date(2022, 12, 12), 'Mr Green', 1, 45, 1, Decimal('45')),
+        ])
+
+    def test_terms_are_only_relabelled_when_the_calendar_version_changes(self):
+        TermCalendarVersion.objects.create(pk=1)
+        terms.invalidate_term_calendar()
+        with mock.patch('lessons.rollups._relabel_terms') as relabel:
+            refresh_rollups()
+            refresh_rollups()
+            self.assertEqual(relabel.call_count, 1)
+            TermCalendarVersion.objects.filter(pk=1).update(version=uuid.uuid4())
+            terms.invalidate_term_calendar()
+            refresh_rollups()
+            self.assertEqual(relabel.call_count, 2)
+
+    def test_summary_lists_terms_in_calendar_order_then_holidays(self):
+        SchoolTerm.objects.create(term_number='four', start_date=datetime.date(2023, 2, 20),
+                                  end_date=datetime.date(2023, 3, 31))
+        SchoolTerm.objects.create(term_number='five', start_date=datetime.date(2023, 4, 17),
+                                  end_date=datetime.date(2023, 5, 26))
+        for transfer_date in (datetime.date(2023, 5, 1), datetime.date(2022, 9, 15), datetime.date(2023, 3, 1)):
+            Transaction.objects.create(invoice_number=998, transfer_date=transfer_date, amount=5, user=self.user)
+        refresh_rollups()
+        self.assertEqual([row['period'] for row in rollup_summary('term')],
+                         ['2022/2023 term 1', '2022/2023 term 4', '2022/2023 term 5', 'Holidays'])
+
+    def test_summary_reads_the_rollups(self):
+        refresh_rollups()
+        with self.assertNumQueries(1):
+            rows = rollup_summary('teacher')
+        self.assertEqual([(row['period'], row['lessons'], row['revenue']) for row in rows],
+                         [('No booking', 0, Decimal('15')), ('Mr Green', 2, Decimal('60'))])
+        self.assertEqual([row['period'] for row in rollup_summary('month')], ['2022-12'])
+        self.assertEqual([row['period'] for row in rollup_summary('term')], ['Holidays'])
+
+    def test_refresh_and_summary_commands(self):
+        output = StringIO()
+        call_command('refresh_rollups', stdout=output)
+        self.assertIn('2 days', output.getvalue())
+        output = StringIO()
+        call_command('rollup_summary', '--by', 'weekday', stdout=output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], 'period,lessons,lesson_minutes,payments,revenue')
+        self.assertEqual(lines[1].split(',')[:4], ['MON', '2', '90', '2'])
+        self.assertEqual(Decimal(lines[1].split(',')[4]), 75)
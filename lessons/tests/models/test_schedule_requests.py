@@ -0,0 +1,68 @@
+import datetime
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from lessons.models import Booking, Child, Request, TeacherAvailability, CustomUser as User
+from lessons.scheduling import schedule_requests
+
+
+class ScheduleRequestsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            first_name='John',
+            last_name='Doe',
+            email='johndoe@example.org',
+            password='Password123',
+        )
+        self.child = Child.objects.create(student=self.user, first_name='Alice', last_name='Doe')
+        TeacherAvailability.objects.create(teacher='Smith Jane', day='FRI', start_time=datetime.time(16, 0),
+                                           end_time=datetime.time(17, 30))
+        self.start_date = datetime.date(2022, 12, 1)
+
+    def _create_request(self, day='FRI', duration=60, child=None):
+        return Request.objects.create(daysAvailable=day, numberOfLessons=3, intervalBetweenLessons=1,
+                                      durationOfLessons=duration, user=self.user, child=child)
+
+    def test_requests_are_turned_into_bookings(self):
+        self._create_request(child=self.child)
+        self._create_request(duration=30)
+        bookings, unscheduled = schedule_requests(Request.objects.all(), self.start_date)
+        self.assertEqual(unscheduled, [])
+        self.assertFalse(Request.objects.exists())
+        self.assertEqual(list(Booking.objects.order_by('time').values_list('teacher', 'time', 'child', 'full_price')), [
+            ('Smith Jane', datetime.time(16, 0), self.child.id, 150),
+            ('Smith Jane', datetime.time(17, 0), None, 150),
+        ])
+        self.assertEqual(Booking.objects.get(time=datetime.time(16, 0)).lessons.count(), 3)
+
+    def test_existing_lessons_are_not_double_booked(self):
+        Booking.objects.create(day='FRI', time=datetime.time(16, 0), teacher='Smith Jane',
+                               start_date=datetime.date(2022, 12, 16), duration=30, interval=1,
+                               number_of_lessons=1, user=self.user)
+        self._create_request()
+        bookings, unscheduled = schedule_requests(Request.objects.all(), self.start_date)
+        self.assertEqual(bookings[0].time, datetime.time(16, 30))
+
+    def test_requests_without_a_free_slot_are_kept(self):
+        self._create_request()
+        unplaceable = self._create_request(day='MON')
+        self._create_request()
+        bookings, unscheduled = schedule_requests(Request.objects.all(), self.start_date)
+        self.assertEqual(len(bookings), 1)
+        self.assertEqual(len(unscheduled), 2)
+        self.assertIn(unplaceable, unscheduled)
+        self.assertEqual(Request.objects.count(), 2)
+
+    def test_schedule_requests_command(self):
+        self._create_request()
+        output = StringIO()
+        call_command('schedule_requests', '--start-date', '2022-12-01', stdout=output)
+        self.assertIn('Bookings created: 1', output.getvalue())
+        self.assertEqual(Booking.objects.get().start_date, self.start_date)
+
+    def test_schedule_requests_command_starts_today_by_default(self):
+        self._create_request()
+        call_command('schedule_requests', stdout=StringIO())
+        today = datetime.date.today()
+        start_date = Booking.objects.get().start_date
+        self.assertTrue(today <= start_date < today + datetime.timedelta(days=7))
@@ -1,4 +1,6 @@
+import datetime
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 from django.test import TestCase
 from lessons.models import SchoolTerm
 
@@ -30,3 +32,14 @@ class SchoolTermTest(TestCase):
         self.term.end_date = None
         with self.assertRaises(ValidationError):
             self.term.full_clean()
+
+    def test_academic_year_is_set_from_start_date(self):
+        self.assertEqual(self.term.academic_year, 2022)
+        term = SchoolTerm.objects.create(term_number='three', start_date=datetime.date(2023, 1, 3),
+                                         end_date=datetime.date(2023, 2, 10))
+        self.assertEqual(term.academic_year, 2022)
+
+    def test_term_number_is_unique_per_academic_year(self):
+        with self.assertRaises(IntegrityError):
+            SchoolTerm.objects.create(term_number='one', start_date=datetime.date(2023, 6, 5),
+                                      end_date=datetime.date(2023, 7, 21))
@@ -0,0 +1,95 @@
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from lessons import seeding
+from lessons.management.commands.seed import Command
+from lessons.models import Bank, Booking, CustomUser, LessonOccurrence
+from lessons.scheduling import find_conflicts
+
+
+class BulkSeedCommandTest(TestCase):
+    """Test suite for the bulk mode of the seed command."""
+
+    def _seed(self, users, batch_size):
+        call_command('seed', users=users, batch_size=batch_size, workers=1, stdout=StringIO())
+
+    def _students(self):
+        return CustomUser.objects.filter(email__endswith='@seed.example.org')
+
+    def test_bulk_seed_creates_numbered_students_with_groups_and_banks(self):
+        self._seed(25, 10)
+        students = self._students()
+        self.assertEqual(students.count(), 25)
+        self.assertEqual(students.filter(groups__name='Student').count(), 25)
+        self.assertEqual(Bank.objects.filter(user__in=students).count(), 25)
+        self.assertTrue(students.get(email='student25@seed.example.org').check_password('Password123'))
+
+    def test_bulk_seed_materialises_lessons(self):
+        self._seed(25, 10)
+        bookings = Booking.objects.filter(user__in=self._students())
+        self.assertEqual(LessonOccurrence.objects.filter(booking__in=bookings).count(),
+                         bookings.aggregate(lessons=Sum('number_of_lessons'))['lessons'])
+
+    def test_bulk_seed_is_idempotent(self):
+        self._seed(20, 10)
+        self._seed(30, 10)
+        self.assertEqual(self._students().count(), 30)
+        bookings = Booking.objects.count()
+        self._seed(30, 7)
+        self.assertEqual(self._students().count(), 30)
+        self.assertEqual(Booking.objects.count(), bookings)
+
+    def test_profile_seeds_its_number_of_students(self):
+        with mock.patch.dict(seeding.PROFILES, {'small': 12}):
+            call_command('seed', profile='small', workers=1, stdout=StringIO())
+        self.assertEqual(self._students().count(), 12)
+
+    def test_generated_students_do_not_depend_on_the_batches(self):
+        whole = seeding.generate_students(1, 40, 'password', '2022-09-01 00:00:00')
+        first = seeding.generate_students(1, 17, 'password', '2022-09-01 00:00:00')
+        rest = seeding.generate_students(18, 40, 'password', '2022-09-01 00:00:00')
+        for table in seeding.TABLES:
+            self.assertEqual(whole[table], first[table] + rest[table])
+
+    def test_bulk_seed_after_other_users_were_created(self):
+        self._seed(5, 10)
+        user = CustomUser.objects.create_user('new@example.org', 'New', 'Student', password='Password123')
+        self._seed(10, 10)
+        self.assertEqual(self._students().count(), 10)
+        self.assertTrue(CustomUser.objects.filter(pk=user.pk, email='new@example.org').exists())
+
+    def test_bulk_seed_links_rows_to_their_student(self):
+        self._seed(30, 10)
+        for booking in Booking.objects.filter(user__in=self._students()).select_related('user', 'child'):
+            if booking.child:
+                self.assertEqual(booking.child.student, booking.user)
+            self.assertTrue(booking.lessons.exists())
+            self.assertFalse(booking.lessons.exclude(teacher=booking.teacher).exists())
+
+    def test_parallel_workers_seed_the_generated_students(self):
+        created = seeding.seed_students(30, batch_size=7, workers=2)
+        self.assertEqual(created, 30)
+        generated = seeding.generate_students(1, 30, 'password', '2022-09-01 00:00:00')
+        self.assertEqual(sorted(self._students().values_list('email', 'first_name', 'last_name')),
+                         sorted((email, first_name, last_name)
+                                for email, password, first_name, last_name, *flags in generated['users']))
+        self.assertEqual(Booking.objects.filter(user__in=self._students()).count(), len(generated['bookings']))
+        self.assertEqual(LessonOccurrence.objects.filter(booking__user__in=self._students()).count(),
+                         len(generated['lessons']))
+
+    def test_bulk_seed_does_not_double_book_teachers(self):
+        self._seed(400, 150)
+        self.assertGreater(Booking.objects.values('teacher').distinct().count(), 1)
+        for booking in Booking.objects.all():
+            self.assertFalse(find_conflicts(booking).exists())
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_random_seed_does_not_double_book_teachers(self):
+        with mock.patch.object(Command, 'USER_COUNT', 30):
+            call_command('seed', stdout=StringIO())
+            call_command('seed', stdout=StringIO())
+        self.assertGreater(Booking.objects.count(), 3)
+        for booking in Booking.objects.all():
+            self.assertFalse(find_conflicts(booking).exists())
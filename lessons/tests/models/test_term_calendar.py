@@ -0,0 +1,71 @@
+import datetime
+import time
+import uuid
+from unittest import mock
+from django.test import TestCase
+from lessons.models import SchoolTerm, TermCalendarVersion
+from lessons import terms
+
+
+class TermCalendarTest(TestCase):
+    fixtures = ['lessons/tests/fixtures/school_terms.json', 'lessons/tests/fixtures/other_school_terms.json']
+
+    def setUp(self):
+        terms.invalidate_term_calendar()
+
+    def test_term_for_date(self):
+        self.assertEqual(terms.term_for(datetime.date(2022, 9, 1)).term_number, 'one')
+        self.assertEqual(terms.term_for(datetime.date(2022, 10, 21)).term_number, 'one')
+        self.assertEqual(terms.term_for(datetime.date(2023, 7, 1)).term_number, 'six')
+        self.assertIsNone(terms.term_for(datetime.date(2022, 10, 22)))
+        self.assertIsNone(terms.term_for(datetime.date(2022, 8, 31)))
+        self.assertIsNone(terms.term_for(datetime.date(2023, 7, 22)))
+
+    def test_is_holiday(self):
+        self.assertTrue(terms.is_holiday(datetime.date(2022, 12, 25)))
+        self.assertFalse(terms.is_holiday(datetime.date(2022, 9, 15)))
+
+    def _later(self):
+        # the time at which the calendar's version is next checked
+        return mock.patch('lessons.terms.time.monotonic',
+                          return_value=time.monotonic() + terms.VERSION_CHECK_SECONDS)
+
+    def test_lookups_run_no_query_once_built(self):
+        terms.get_term_calendar()
+        with self.assertNumQueries(0):
+            for day in range(1, 29):
+                terms.term_for(datetime.date(2023, 2, day))
+                terms.is_holiday(datetime.date(2023, 2, day))
+
+    def test_version_is_checked_again_after_a_while(self):
+        terms.get_term_calendar()
+        with self._later(), self.assertNumQueries(1):
+            for day in range(1, 29):
+                terms.term_for(datetime.date(2023, 2, day))
+
+    def test_calendar_is_rebuilt_when_terms_change(self):
+        self.assertTrue(terms.is_holiday(datetime.date(2022, 11, 15)))
+        term = SchoolTerm.objects.create(term_number='two', start_date=datetime.date(2022, 10, 31),
+                                         end_date=datetime.date(2022, 12, 16))
+        self.assertEqual(terms.term_for(datetime.date(2022, 11, 15)), term)
+        term.delete()
+        self.assertTrue(terms.is_holiday(datetime.date(2022, 11, 15)))
+
+    def test_calendar_is_rebuilt_when_another_process_changes_terms(self):
+        self.assertTrue(terms.is_holiday(datetime.date(2022, 11, 15)))
+        # a change committed by another process: no signal reaches this one, only the new version
+        SchoolTerm.objects.filter(term_number='one').update(end_date=datetime.date(2022, 11, 30))
+        TermCalendarVersion.objects.update_or_create(pk=1, defaults={'version': uuid.uuid4()})
+        self.assertTrue(terms.is_holiday(datetime.date(2022, 11, 15)))
+        with self._later():
+            self.assertFalse(terms.is_holiday(datetime.date(2022, 11, 15)))
+
+    def test_version_changes_only_when_the_transaction_commits(self):
+        terms.get_term_calendar()
+        with self.captureOnCommitCallbacks() as callbacks:
+            SchoolTerm.objects.create(term_number='two', start_date=datetime.date(2022, 10, 31),
+                                      end_date=datetime.date(2022, 12, 16))
+            self.assertFalse(TermCalendarVersion.objects.exists())
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertTrue(TermCalendarVersion.objects.exists())
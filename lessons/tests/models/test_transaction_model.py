@@ -1,5 +1,5 @@
 from django.test import TestCase 
-from lessons.models import Transaction
+from lessons.models import Transaction, Booking
 from django.core.exceptions import ValidationError
 from lessons.models import CustomUser as User
 
@@ -12,8 +12,18 @@ class TransactionsModelTest(TestCase):
             password='Password123',
         )
         
+        self.booking = Booking.objects.create(
+            day = 'MON',
+            time = '09:00',
+            teacher = 'Mr Green',
+            start_date = '2022-12-01',
+            number_of_lessons = 2,
+            interval = 1,
+            duration = 30,
+            user = self.user)
+
         self.transactions = Transaction.objects.create(
-            invoice_id = '0001',
+            invoice = self.booking,
             transfer_date = '2022-12-02',
             amount = '5.00',
             user = self.user            
@@ -59,4 +69,10 @@ class TransactionsModelTest(TestCase):
     def test_user_should_be_the_correct_user(self):
         givenUser = self.transactions.user
         self.assertEqual(self.user, givenUser, 'User should be John')
-    
\ No newline at end of file
+
+    def test_invoice_number_is_kept_when_booking_is_deleted(self):
+        booking_id = self.booking.id
+        self.booking.delete()
+        self.transactions.refresh_from_db()
+        self.assertIsNone(self.transactions.invoice)
+        self.assertEqual(self.transactions.invoice_number, booking_id)
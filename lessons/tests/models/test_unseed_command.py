@@ -0,0 +1,57 @@
+import datetime
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from lessons import seeding, terms
+from lessons.models import (Bank, Booking, Child, CustomUser, DailyRollup, LessonOccurrence, Request, SchoolTerm,
+                            Transaction)
+from lessons.rollups import refresh_rollups
+
+
+class UnseedCommandTest(TestCase):
+    """Test suite for the set-based unseed command."""
+    fixtures = ['lessons/tests/fixtures/school_terms.json']
+
+    def setUp(self):
+        seeding.seed_students(20, batch_size=8)
+        self.fixed = CustomUser.objects.create_user('john.doe@example.org', 'John', 'Doe', password='Password123')
+        Bank.objects.create_bank(self.fixed)
+        self.booking = Booking.objects.create(day='FRI', time='16:00', teacher='Smith Jane', start_date='2022-12-02',
+                                              duration=60, interval=2, number_of_lessons=6, user=self.fixed)
+        self.staff = CustomUser.objects.create_user('staff@example.org', 'Staff', 'Member', is_staff=True)
+        self.student = CustomUser.objects.get(email='student1@seed.example.org')
+        student_booking = Booking.objects.filter(user=self.student).first() or Booking.objects.create(
+            day='MON', time='09:00', teacher='Mr Green', start_date='2022-12-05', duration=30, interval=1,
+            number_of_lessons=2, user=self.student)
+        Transaction.objects.create(invoice=student_booking, transfer_date=datetime.date(2022, 12, 5), amount=10,
+                                   user=self.fixed)
+        refresh_rollups()
+
+    def _unseed(self, *args):
+        call_command('unseed', *args, stdout=StringIO())
+
+    def test_unseed_deletes_students_and_everything_they_own(self):
+        self._unseed()
+        self.assertEqual(list(CustomUser.objects.all()), [self.staff])
+        for model in (Bank, Child, Request, Booking, LessonOccurrence, Transaction, DailyRollup, SchoolTerm):
+            self.assertFalse(model.objects.exists(), model.__name__)
+
+    def test_unseed_can_keep_the_fixed_accounts(self):
+        self._unseed('--keep-fixed')
+        self.assertEqual(set(CustomUser.objects.all()), {self.fixed, self.staff})
+        self.assertEqual(list(Booking.objects.all()), [self.booking])
+        self.assertEqual(LessonOccurrence.objects.count(), 6)
+        self.assertEqual(Bank.objects.get().user, self.fixed)
+        self.assertIsNone(Transaction.objects.get(user=self.fixed).invoice)
+        self.assertFalse(DailyRollup.objects.exists())
+
+    def test_unseed_forgets_the_deleted_terms(self):
+        terms.invalidate_term_calendar()
+        self.assertIsNotNone(terms.term_for(datetime.date(2022, 10, 3)))
+        with self.captureOnCommitCallbacks(execute=True):
+            self._unseed()
+        self.assertIsNone(terms.term_for(datetime.date(2022, 10, 3)))
+
+    def test_unseed_does_not_load_rows_into_python(self):
+        with self.assertNumQueries(1 + len(seeding.UNSEED_TABLES) + len(seeding.CLEARED_TABLES) + 2):
+            seeding.unseed()
@@ -1,3 +1,5 @@
+from django.db import connection
+from django.db.models import Q
 from django.test import TestCase
 from django.urls import reverse
 from lessons.models import CustomUser
@@ -54,6 +56,57 @@ class AdminListTest(TestCase):
             self.assertContains(response, f'Last{user_id}')
             user = CustomUser.objects.get(email=f'user{user_id}@test.org')
 
+    def test_get_admin_list_is_paginated(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self._create_test_admins(0, 30)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['admin']), 25)
+        next_url = response.context['next_url']
+        self.assertIsNotNone(next_url)
+        response = self.client.get(self.url + next_url)
+        self.assertEqual(len(response.context['admin']), 30 + 1 - 25)
+        self.assertIsNone(response.context['next_url'])
+
+    def test_get_admin_list_search(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self._create_test_admins(0, 3)
+        response = self.client.get(self.url, {'q': 'first1'})
+        self.assertEqual([user.email for user in response.context['admin']], ['user1@test.org'])
+        response = self.client.get(self.url, {'q': 'jane'})
+        self.assertEqual([user.email for user in response.context['admin']], [self.other_user.email])
+
+    def test_search_is_case_insensitive(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url, {'q': 'JANE'})
+        self.assertEqual([user.email for user in response.context['admin']], [self.other_user.email])
+
+    def test_search_can_use_the_search_indexes(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('checks the SQLite query plan')
+        search = CustomUser.objects.filter(Q(email__istartswith='ja') | Q(first_name__istartswith='ja') |
+                                           Q(last_name__istartswith='ja'))
+        plan = search.values('pk').explain()
+        for column in ('email', 'first_name', 'last_name'):
+            self.assertIn(f'lessons_customuser_{column}_search', plan)
+
+    def test_get_admin_list_query_count_does_not_grow_with_admins(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self._create_test_admins(0, 2)
+        self.client.get(self.url)
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+        self._create_test_admins(2, 20)
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+
+    def test_get_admin_list_flags_directors(self):
+        self.client.login(email=self.user.email, password='Password123')
+        director = Group.objects.get(name='Director')
+        director.user_set.add(self.other_user)
+        response = self.client.get(self.url)
+        self.assertTrue(response.context['admin'][0].is_director)
+        self.assertContains(response, 'Remove super-admin')
+
     def test_edit_admin(self):
         self.client.login(email = self.user.email, password='Password123')
         response = self.client.post(self.url, self.edit, follow = True)
@@ -0,0 +1,90 @@
+import datetime
+from django.test import TestCase
+from django.urls import reverse
+from lessons.models import CustomUser, Bank, Booking, Request
+from django.contrib.auth.models import Group
+
+
+class AdministratorsTest(TestCase):
+    """Test suite for the administrators dashboard."""
+    fixtures = ['lessons/tests/fixtures/default_user.json', 'lessons/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        self.url = reverse('administrators')
+        self.user = CustomUser.objects.get(email='johndoe@example.org')
+        admin, created = Group.objects.get_or_create(name='Admin')
+        admin.user_set.add(self.user)
+        self.student = CustomUser.objects.get(email='janedoe@example.org')
+        student, created = Group.objects.get_or_create(name='Student')
+        student.user_set.add(self.student)
+        Bank.objects.create_bank(self.student)
+
+    def test_administrators_url(self):
+        self.assertEqual(self.url, '/administrator/')
+
+    def test_get_administrators(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self._create_bookings(3)
+        self._create_requests(2)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'administrators.html')
+        self.assertEqual(len(response.context['booking']), 3)
+        self.assertEqual(len(response.context['request']), 2)
+        self.assertIsNone(response.context['next_bookings_url'])
+        self.assertIsNone(response.context['next_requests_url'])
+
+    def test_get_administrators_redirects_students(self):
+        self.client.login(email=self.student.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse('student'), status_code=302, target_status_code=200)
+
+    def test_bookings_and_requests_are_paginated_separately(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self._create_bookings(30)
+        self._create_requests(3)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['booking']), 25)
+        self.assertIsNone(response.context['next_requests_url'])
+        last_id = response.context['booking'][-1].id
+        response = self.client.get(self.url + response.context['next_bookings_url'])
+        self.assertEqual(len(response.context['booking']), 5)
+        self.assertEqual(len(response.context['request']), 3)
+        self.assertTrue(all(booking.id > last_id for booking in response.context['booking']))
+
+    def test_filter_bookings_by_teacher_day_and_start_date(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self._create_bookings(2)
+        self._create_bookings(1, teacher='Green Tom', day='MON')
+        response = self.client.get(self.url, {'teacher': 'Green Tom'})
+        self.assertEqual([booking.teacher for booking in response.context['booking']], ['Green Tom'])
+        response = self.client.get(self.url, {'day': 'FRI', 'start_date': '2022-12-02'})
+        self.assertEqual(len(response.context['booking']), 2)
+        response = self.client.get(self.url, {'start_date': '2023-01-01'})
+        self.assertEqual(len(response.context['booking']), 0)
+
+    def test_invalid_filter_is_ignored(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self._create_bookings(2)
+        response = self.client.get(self.url, {'start_date': 'not a date', 'bookings_after': 'x'})
+        self.assertEqual(len(response.context['booking']), 2)
+
+    def test_delete_booking(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self._create_bookings(1)
+        booking = Booking.objects.get()
+        response = self.client.post(self.url, {'delete': booking.id}, follow=True)
+        self.assertRedirects(response, self.url, status_code=302, target_status_code=200)
+        self.assertFalse(Booking.objects.exists())
+
+    def _create_bookings(self, count, teacher='Smith Jane', day='FRI'):
+        for _ in range(count):
+            Booking.objects.create(day=day, time=datetime.time(16, 0), teacher=teacher,
+                                   start_date=datetime.date(2022, 12, 2), duration=60,
+                                   interval=2, number_of_lessons=6, full_price=300,
+                                   user=self.student)
+
+    def _create_requests(self, count):
+        for _ in range(count):
+            Request.objects.create(daysAvailable='FRI', numberOfLessons=6, intervalBetweenLessons=2,
+                                   durationOfLessons=60, user=self.student)
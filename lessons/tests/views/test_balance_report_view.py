@@ -0,0 +1,98 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from lessons.models import Booking, Child, CustomUser
+from lessons.reports import balance_page, balances, parse_balance_key
+from django.contrib.auth.models import Group
+
+
+class BalanceReportViewTest(TestCase):
+    """Test suite for the debtor and overpayment report."""
+    fixtures = ['lessons/tests/fixtures/default_user.json', 'lessons/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        self.url = reverse('balance_report')
+        self.user = CustomUser.objects.get(email='johndoe@example.org')
+        admin, created = Group.objects.get_or_create(name='Admin')
+        admin.user_set.add(self.user)
+        self.debtor = CustomUser.objects.get(email='janedoe@example.org')
+        self.overpayer = CustomUser.objects.get(email='petrapickles@example.org')
+        self.child = Child.objects.create(student=self.debtor, first_name='Alice', last_name='Doe')
+        self._book(self.debtor, None, full_price=100, payment_made=40)
+        self._book(self.debtor, None, full_price=50, payment_made=50)
+        self._book(self.debtor, self.child, full_price=200, payment_made=150)
+        self._book(self.overpayer, None, full_price=100, payment_made=130)
+
+    def _book(self, user, child, full_price, payment_made):
+        return Booking.objects.create(day='MON', time='09:00', teacher='Mr Green', start_date='2022-12-05',
+                                      duration=30, interval=1, number_of_lessons=2, price_per_lesson=50,
+                                      full_price=full_price, payment_made=payment_made, user=user, child=child)
+
+    def _outstanding(self, response):
+        return [(row['user_id'], row['child_key'], row['outstanding']) for row in response.context['balances']]
+
+    def test_balance_report_url(self):
+        self.assertEqual(self.url, '/balances/')
+
+    def test_balance_report_redirects_students(self):
+        student, created = Group.objects.get_or_create(name='Student')
+        student.user_set.add(self.debtor)
+        self.client.login(email=self.debtor.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_debtors_are_grouped_per_user_and_child(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'balance_report.html')
+        self.assertEqual(self._outstanding(response), [(self.debtor.id, 0, 60), (self.debtor.id, self.child.id, 50)])
+        self.assertEqual(response.context['balances'][0]['bookings'], 2)
+
+    def test_overpaid_balances(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url, {'show': 'overpaid'})
+        self.assertEqual(self._outstanding(response), [(self.overpayer.id, 0, -30)])
+
+    def test_report_is_paginated_on_user_and_child(self):
+        rows = balances('all')
+        keys = []
+        page, next_after = balance_page(rows, page_size=1)
+        while next_after:
+            keys.append(next_after)
+            page, next_after = balance_page(rows, parse_balance_key(next_after), page_size=1)
+        self.assertEqual(keys, [f'{self.debtor.id}-0', f'{self.debtor.id}-{self.child.id}'])
+        self.assertEqual([row['user_id'] for row in page], [self.overpayer.id])
+
+    def test_next_url_is_only_set_when_there_are_more_rows(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url, {'show': 'all', 'after': f'{self.debtor.id}-0'})
+        self.assertEqual(len(response.context['balances']), 2)
+        self.assertIsNone(response.context['next_url'])
+
+    def test_report_runs_one_query_per_page(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self.client.get(self.url)
+        with self.assertNumQueries(4):
+            self.client.get(self.url, {'show': 'all'})
+
+    def test_report_streams_csv(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url, {'show': 'all', 'format': 'csv'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('user_id,user__email'))
+        self.assertEqual(len(lines), 4)
+
+    def test_report_with_invalid_filters(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url, {'show': 'everyone'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_balance_report_command(self):
+        output = StringIO()
+        call_command('balance_report', '--show', 'overpaid', stdout=output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn(self.overpayer.email, lines[1])
@@ -0,0 +1,34 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import URLPattern
+from lessons.benchmarks import BENCHMARK_VIEWS, SKIPPED_URLS, percentile, run_benchmarks
+from msms import urls
+
+
+class ViewBenchmarksTest(TestCase):
+    """Keep the view benchmarks runnable: every page is covered and answers its role with a 200."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed', users=20, workers=1, stdout=StringIO())
+
+    def test_every_named_url_is_benchmarked(self):
+        names = {pattern.name for pattern in urls.urlpatterns if isinstance(pattern, URLPattern)}
+        self.assertEqual({name for name, role, url_kwargs in BENCHMARK_VIEWS} | SKIPPED_URLS, names)
+
+    def test_every_view_answers_its_role(self):
+        results = run_benchmarks(iterations=2)
+        self.assertEqual(len(results), len(BENCHMARK_VIEWS))
+        for name, result in results.items():
+            self.assertEqual(result['status'], 200, name)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+        self.assertEqual(results['student']['role'], 'Student')
+        self.assertGreater(results['administrators']['queries'], 0)
+
+    def test_benchmarks_can_be_limited_to_some_views(self):
+        self.assertEqual(list(run_benchmarks(iterations=1, views=['home'])), ['home'])
+
+    def test_percentile(self):
+        self.assertEqual(percentile([4, 1, 3, 2], 0.5), 2.5)
+        self.assertAlmostEqual(percentile(range(1, 101), 0.95), 95.05)
@@ -0,0 +1,63 @@
+import datetime
+from django.test import TestCase
+from django.urls import reverse
+from lessons.forms import BookingForm
+from lessons.models import CustomUser, Booking, Transaction
+from django.contrib.auth.models import Group
+
+
+class EditBookingTest(TestCase):
+    """Test suite for the edit booking view."""
+    fixtures = ['lessons/tests/fixtures/default_user.json', 'lessons/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        self.user = CustomUser.objects.get(email='johndoe@example.org')
+        admin, created = Group.objects.get_or_create(name='Admin')
+        admin.user_set.add(self.user)
+        self.student = CustomUser.objects.get(email='janedoe@example.org')
+        self.booking = Booking.objects.create(day='FRI', time=datetime.time(16, 0), teacher='Smith Jane',
+                                              start_date=datetime.date(2022, 12, 2), duration=60,
+                                              interval=2, number_of_lessons=6, full_price=300,
+                                              payment_made=100, user=self.student)
+        self.url = reverse('edit_booking', kwargs={'booking_id': self.booking.id})
+        self.form_input = {
+            'day': 'MON',
+            'time': '10:00',
+            'teacher': 'Green Tom',
+            'start_date': '2022-12-05',
+            'duration': 30,
+            'interval': 1,
+            'number_of_lessons': '4',
+            'price_per_lesson': '40',
+        }
+
+    def test_edit_booking_url(self):
+        self.assertEqual(self.url, f'/edit_booking/{self.booking.id}')
+
+    def test_get_edit_booking(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'edit_booking.html')
+        self.assertTrue(isinstance(response.context['form'], BookingForm))
+
+    def test_get_edit_booking_with_invalid_id(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(reverse('edit_booking', kwargs={'booking_id': self.booking.id + 1}))
+        self.assertRedirects(response, reverse('administrators'), status_code=302, target_status_code=200)
+
+    def test_edit_booking_updates_in_place(self):
+        Transaction.objects.create(invoice=self.booking, transfer_date=datetime.date(2022, 12, 1), amount=100,
+                                   user=self.student)
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.post(self.url, self.form_input)
+        self.assertRedirects(response, reverse('administrators'), status_code=302, target_status_code=200)
+        booking = Booking.objects.get()
+        self.assertEqual(booking.id, self.booking.id)
+        self.assertEqual(booking.teacher, 'Green Tom')
+        self.assertEqual(booking.full_price, 160)
+        self.assertEqual(booking.payment_made, 100)
+        self.assertEqual(booking.user, self.student)
+        self.assertEqual(booking.transactions.count(), 1)
+        self.assertEqual(set(booking.lessons.values_list('teacher', flat=True)), {'Green Tom'})
+        self.assertEqual(booking.lessons.count(), 4)
@@ -0,0 +1,79 @@
+import datetime
+import json
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from lessons.models import CustomUser, Transaction
+from django.contrib.auth.models import Group
+
+
+class ExportTransactionsTest(TestCase):
+    """Test suite for the streaming transaction export."""
+    fixtures = ['lessons/tests/fixtures/default_user.json', 'lessons/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        self.url = reverse('export_transactions')
+        self.user = CustomUser.objects.get(email='johndoe@example.org')
+        admin, created = Group.objects.get_or_create(name='Admin')
+        admin.user_set.add(self.user)
+        self.student = CustomUser.objects.get(email='janedoe@example.org')
+        self.other_student = CustomUser.objects.get(email='petrapickles@example.org')
+        for day in range(1, 4):
+            Transaction.objects.create(invoice_number=day, transfer_date=datetime.date(2022, 12, day), amount=day * 10,
+                                       user=self.student)
+        Transaction.objects.create(invoice_number=4, transfer_date=datetime.date(2022, 12, 2), amount=5,
+                                   user=self.other_student)
+
+    def test_export_transactions_url(self):
+        self.assertEqual(self.url, '/all_transactions/export/')
+
+    def test_export_redirects_students(self):
+        student, created = Group.objects.get_or_create(name='Student')
+        student.user_set.add(self.student)
+        self.client.login(email=self.student.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_export_csv(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,invoice_number,transfer_date,amount,user_id,user__email,user__first_name,user__last_name')
+        self.assertEqual(len(lines), 5)
+
+    def test_export_jsonl_filtered_by_date_and_user(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url, {'format': 'jsonl', 'start': '2022-12-02', 'end': '2022-12-03',
+                                              'user': self.student.email})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['transfer_date'] for row in rows], ['2022-12-02', '2022-12-03'])
+        self.assertEqual({row['user__email'] for row in rows}, {self.student.email})
+
+    def test_export_with_invalid_filters(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url, {'start': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_command(self):
+        output = StringIO()
+        call_command('export_transactions', '--user', self.other_student.email, stdout=output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn(self.other_student.email, lines[1])
+
+    def test_export_command_rejects_invalid_dates(self):
+        with self.assertRaisesMessage(CommandError, '--start must be a date'):
+            call_command('export_transactions', '--start', '2022-13-01', stdout=StringIO())
+
+    def test_export_csv_escapes_formulas(self):
+        self.student.first_name = '=HYPERLINK("http://example.com")'
+        self.student.last_name = '-1+2'
+        self.student.save()
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url, {'user': self.student.email})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[1].endswith(',"\'=HYPERLINK(""http://example.com"")",\'-1+2'))
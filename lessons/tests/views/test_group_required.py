@@ -0,0 +1,76 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from lessons.models import CustomUser
+from lessons.helpers import get_user_groups
+from lessons.templatetags.auth_extras import has_group
+from django.contrib.auth.models import Group
+
+
+class GroupRequiredTest(TestCase):
+    """Tests of the memoized role resolution used by the access decorators."""
+    fixtures = ['lessons/tests/fixtures/default_user.json', 'lessons/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        self.user = CustomUser.objects.get(email='johndoe@example.org')
+        self.other_user = CustomUser.objects.get(email='janedoe@example.org')
+        self.admin, created = Group.objects.get_or_create(name='Admin')
+        self.director, created = Group.objects.get_or_create(name='Director')
+        self.admin.user_set.add(self.user)
+
+    def test_groups_are_loaded_once_per_request(self):
+        user = CustomUser.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_user_groups(user), {'Admin'})
+            get_user_groups(user)
+
+    def test_groups_are_reloaded_by_the_next_request(self):
+        get_user_groups(CustomUser.objects.get(pk=self.user.pk))
+        self.user.groups.remove(self.admin)
+        user = CustomUser.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_user_groups(user), set())
+
+    def test_memoized_groups_follow_group_changes(self):
+        self.assertEqual(get_user_groups(CustomUser.objects.get(pk=self.user.pk)), {'Admin'})
+        self.director.user_set.add(self.user)
+        self.assertEqual(get_user_groups(CustomUser.objects.get(pk=self.user.pk)), {'Admin', 'Director'})
+        self.user.groups.remove(self.admin)
+        self.assertEqual(get_user_groups(self.user), {'Director'})
+        self.director.user_set.clear()
+        self.assertEqual(get_user_groups(CustomUser.objects.get(pk=self.user.pk)), set())
+
+    def test_has_group_filter_uses_memoized_groups(self):
+        user = CustomUser.objects.get(pk=self.user.pk)
+        get_user_groups(user)
+        with self.assertNumQueries(0):
+            self.assertTrue(has_group(user, 'Admin'))
+            self.assertFalse(has_group(user, 'Director'))
+
+    def test_page_render_loads_groups_once(self):
+        self.client.login(email=self.user.email, password='Password123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('school_term'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Requests for Lessons', count=0)
+        self.assertContains(response, 'School term')
+        group_queries = [query for query in queries if 'auth_group' in query['sql']]
+        self.assertEqual(len(group_queries), 1)
+
+    def test_anonymous_user_has_no_groups(self):
+        response = self.client.get(reverse('administrators'))
+        self.assertRedirects(response, reverse('log_in'), status_code=302, target_status_code=200)
+
+    def test_director_demotion_is_visible_on_next_request(self):
+        self.director.user_set.add(self.user)
+        self.admin.user_set.add(self.other_user)
+        self.director.user_set.add(self.other_user)
+        self.client.login(email=self.other_user.email, password='Password123')
+        response = self.client.get(reverse('create_admin'))
+        self.assertEqual(response.status_code, 200)
+        self.client.login(email=self.user.email, password='Password123')
+        self.client.post(reverse('admin_list'), {'super_admin': self.other_user.email})
+        self.client.login(email=self.other_user.email, password='Password123')
+        response = self.client.get(reverse('create_admin'))
+        self.assertRedirects(response, reverse('administrators'), status_code=302, target_status_code=200)
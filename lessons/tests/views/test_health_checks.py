@@ -0,0 +1,51 @@
+from unittest import mock
+from django.db import OperationalError
+from django.test import TestCase
+from lessons import health
+
+
+class HealthCheckTest(TestCase):
+    """Test suite for the liveness and readiness probes."""
+
+    def setUp(self):
+        health.readiness.reset()
+
+    def test_liveness_needs_no_database(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/healthz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'ok')
+
+    def test_probes_skip_sessions(self):
+        response = self.client.get('/healthz')
+        self.assertNotIn('Vary', response)
+        self.assertEqual(response.cookies, {})
+
+    def test_ready_when_database_answers_and_is_migrated(self):
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'ready')
+
+    def test_readiness_is_cached(self):
+        self.client.get('/readyz')
+        with self.assertNumQueries(0):
+            response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 200)
+
+    def test_readiness_pings_again_once_the_cache_expires(self):
+        self.client.get('/readyz')
+        with mock.patch.object(health, 'READINESS_CACHE_SECONDS', 0), self.assertNumQueries(3):
+            self.client.get('/readyz')  # savepoint, SELECT 1 and release; migrations are not checked again
+
+    def test_not_ready_when_database_fails(self):
+        with mock.patch('lessons.health.connection.cursor', side_effect=OperationalError('down')):
+            response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.content, b'database unavailable: OperationalError')
+
+    def test_not_ready_with_unapplied_migrations(self):
+        with mock.patch('lessons.health.MigrationExecutor') as executor:
+            executor.return_value.migration_plan.return_value = [('lessons', '9999_pending')]
+            response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.content, b'unapplied migrations')
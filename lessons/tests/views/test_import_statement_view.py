@@ -0,0 +1,148 @@
+import datetime
+from decimal import Decimal
+import os
+import tempfile
+from io import StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from lessons.models import CustomUser, Booking, Transaction
+from lessons.statements import StatementAlreadyImported, import_statement, read_statement
+from django.contrib.auth.models import Group
+
+
+class ImportStatementTest(TestCase):
+    """Test suite for the bank statement import."""
+    fixtures = ['lessons/tests/fixtures/default_user.json', 'lessons/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        self.url = reverse('import_statement')
+        self.user = CustomUser.objects.get(email='johndoe@example.org')
+        admin, created = Group.objects.get_or_create(name='Admin')
+        admin.user_set.add(self.user)
+        self.student = CustomUser.objects.get(email='janedoe@example.org')
+        self.bookings = [
+            Booking.objects.create(day='FRI', time=datetime.time(16, 0), teacher='Smith Jane',
+                                   start_date=datetime.date(2022, 12, 2), duration=60,
+                                   interval=2, number_of_lessons=6, full_price=300, user=self.student)
+            for _ in range(2)
+        ]
+        first, second = (booking.id for booking in self.bookings)
+        self.statement = (
+            'invoice_id,date,amount\n'
+            f'{first},2022-12-01,100.00\n'
+            f'{second},2022-12-01,50.00\n'
+            f'{first},2022-12-08,25.50\n'
+            f'{second + 100},2022-12-08,10.00\n'
+            f'{first},not a date,10.00\n'
+        )
+
+    def test_import_statement_url(self):
+        self.assertEqual(self.url, '/all_transactions/import/')
+
+    def test_import_applies_payments_in_batches(self):
+        imported, rejected = import_statement(read_statement(StringIO(self.statement)), batch_size=2)
+        self.assertEqual(imported, 3)
+        self.assertEqual([row['reason'] for row in rejected], ['unknown invoice', 'malformed row'])
+        first, second = (Booking.objects.get(id=booking.id) for booking in self.bookings)
+        self.assertEqual(first.payment_made, Decimal('125.50'))
+        self.assertEqual(second.payment_made, 50)
+        self.assertEqual(first.transactions.count(), 2)
+        self.assertEqual(set(Transaction.objects.values_list('user', flat=True)), {self.student.id})
+
+    def test_import_rejects_amounts_the_transaction_cannot_hold(self):
+        first = self.bookings[0].id
+        statement = (
+            'invoice_id,date,amount\n'
+            f'{first},2022-12-01,123456789\n'
+            f'{first},2022-12-01,100.999\n'
+            f'{first},2022-12-01,NaN\n'
+            f'{first},2022-12-01,9999.99\n'
+        )
+        imported, rejected = import_statement(read_statement(StringIO(statement)))
+        self.assertEqual(imported, 1)
+        self.assertEqual([row['reason'] for row in rejected],
+                         ['amount out of range', 'more than 2 decimal places', 'malformed row'])
+        self.assertEqual(Booking.objects.get(id=first).payment_made, Decimal('9999.99'))
+
+    def test_rows_whose_reference_was_imported_are_rejected(self):
+        first, second = (booking.id for booking in self.bookings)
+        statement = (f'invoice_id,date,amount,reference\n{first},2022-12-01,100.00,TX1\n'
+                     f'{second},2022-12-01,50.00,TX2\n{first},2022-12-01,100.00,TX1\n')
+        imported, rejected = import_statement(read_statement(StringIO(statement)))
+        self.assertEqual(imported, 2)
+        self.assertEqual([row['reason'] for row in rejected], ['duplicate payment'])
+        # a later statement overlapping this one
+        statement = f'invoice_id,date,amount,reference\n{second},2022-12-01,50.00,TX2\n{second},2022-12-02,50,TX3\n'
+        imported, rejected = import_statement(read_statement(StringIO(statement)))
+        self.assertEqual(imported, 1)
+        self.assertEqual([(row['reference'], row['reason']) for row in rejected], [('TX2', 'duplicate payment')])
+        self.assertEqual(Booking.objects.get(id=second).payment_made, 100)
+        self.assertEqual(Transaction.objects.get(reference='TX3').amount, 50)
+
+    def test_identical_payments_without_a_reference_are_all_applied(self):
+        first = self.bookings[0].id
+        Transaction.objects.create(invoice=self.bookings[0], transfer_date=datetime.date(2022, 12, 1), amount=100,
+                                   user=self.student)
+        statement = f'invoice_id,date,amount\n{first},2022-12-01,100.00\n{first},2022-12-01,100\n'
+        imported, rejected = import_statement(read_statement(StringIO(statement)))
+        self.assertEqual((imported, rejected), (2, []))
+        self.assertEqual(Booking.objects.get(id=first).payment_made, 200)
+
+    def test_importing_a_statement_file_again_is_refused(self):
+        import_statement(read_statement(StringIO(self.statement)), digest='a' * 64)
+        with self.assertRaises(StatementAlreadyImported):
+            import_statement(read_statement(StringIO(self.statement)), digest='a' * 64)
+        self.assertEqual(Booking.objects.get(id=self.bookings[0].id).payment_made, Decimal('125.50'))
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_upload_statement(self):
+        self.client.login(email=self.user.email, password='Password123')
+        upload = SimpleUploadedFile('statement.csv', self.statement.encode(), content_type='text/csv')
+        response = self.client.post(self.url, {'statement': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'import_statement.html')
+        self.assertEqual(len(response.context['rejected']), 2)
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_upload_statement_again(self):
+        self.client.login(email=self.user.email, password='Password123')
+        for _ in range(2):
+            upload = SimpleUploadedFile('statement.csv', self.statement.encode(), content_type='text/csv')
+            response = self.client.post(self.url, {'statement': upload})
+        self.assertFormError(response, 'form', 'statement', 'This statement has already been imported.')
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_upload_statement_that_is_not_utf8(self):
+        self.client.login(email=self.user.email, password='Password123')
+        upload = SimpleUploadedFile('statement.csv', self.statement.encode() + 'Zoë'.encode('latin-1'),
+                                    content_type='text/csv')
+        response = self.client.post(self.url, {'statement': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response, 'form', 'statement', 'The statement must be a CSV file encoded as UTF-8.')
+        self.assertEqual(Transaction.objects.count(), 0)
+
+    def test_import_command_rejects_file_that_is_not_utf8(self):
+        with tempfile.TemporaryDirectory() as directory:
+            statement_path = os.path.join(directory, 'statement.csv')
+            with open(statement_path, 'wb') as statement:
+                statement.write(self.statement.encode('utf-16'))
+            with self.assertRaisesMessage(CommandError, 'is not encoded as UTF-8'):
+                call_command('import_statement', statement_path, stdout=StringIO())
+        self.assertEqual(Transaction.objects.count(), 0)
+
+    def test_import_command_writes_reject_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            statement_path = os.path.join(directory, 'statement.csv')
+            reject_path = os.path.join(directory, 'rejects.csv')
+            with open(statement_path, 'w') as statement:
+                statement.write(self.statement)
+            call_command('import_statement', statement_path, '--reject-file', reject_path, stdout=StringIO())
+            with open(reject_path) as rejects:
+                lines = rejects.read().splitlines()
+            with self.assertRaisesMessage(CommandError, 'has already been imported'):
+                call_command('import_statement', statement_path, stdout=StringIO())
+        self.assertEqual(lines[0], 'invoice_id,date,amount,reference,reason')
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(Transaction.objects.count(), 3)
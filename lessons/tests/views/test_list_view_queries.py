@@ -0,0 +1,54 @@
+import datetime
+from django.test import TestCase
+from django.urls import reverse
+from lessons.models import CustomUser, Bank, Booking, Child, Request, Transaction
+from django.contrib.auth.models import Group
+
+
+class ListViewQueriesTest(TestCase):
+    """The list views must run a fixed number of queries however many rows they render."""
+    fixtures = ['lessons/tests/fixtures/default_user.json', 'lessons/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        self.admin = CustomUser.objects.get(email='johndoe@example.org')
+        admin, created = Group.objects.get_or_create(name='Admin')
+        admin.user_set.add(self.admin)
+        self.student = CustomUser.objects.get(email='janedoe@example.org')
+        student, created = Group.objects.get_or_create(name='Student')
+        student.user_set.add(self.student)
+        Bank.objects.create_bank(self.student)
+        self.child = Child.objects.create(student=self.student, first_name='Alice', last_name='Doe')
+
+    def test_administrators_query_count(self):
+        self.client.login(email=self.admin.email, password='Password123')
+        self._assert_constant_queries(reverse('administrators'), 5)
+
+    def test_all_transactions_query_count(self):
+        self.client.login(email=self.admin.email, password='Password123')
+        self._assert_constant_queries(reverse('all_transactions'), 4)
+
+    def test_student_query_count(self):
+        self.client.login(email=self.student.email, password='Password123')
+        self._assert_constant_queries(reverse('student'), 6)
+
+    def _assert_constant_queries(self, url, num_queries):
+        self.client.get(url)  # warm up the session
+        self._create_rows(1)
+        with self.assertNumQueries(num_queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self._create_rows(10)
+        with self.assertNumQueries(num_queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def _create_rows(self, count):
+        for _ in range(count):
+            booking = Booking.objects.create(day='FRI', time=datetime.time(16, 0), teacher='Smith Jane',
+                                             start_date=datetime.date(2022, 12, 2), duration=60,
+                                             interval=2, number_of_lessons=6, full_price=300,
+                                             user=self.student, child=self.child)
+            Request.objects.create(daysAvailable='FRI', numberOfLessons=6, intervalBetweenLessons=2,
+                                   durationOfLessons=60, user=self.student, child=self.child)
+            Transaction.objects.create(invoice_id=booking.id, transfer_date=datetime.date(2022, 12, 1),
+                                       amount=50, user=self.student)
@@ -0,0 +1,109 @@
+import datetime
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from lessons.metrics import metrics_text
+from lessons.models import Bank, Booking, CustomUser
+
+# A gunicorn worker: load the config as gunicorn does, then count a log in
+WORKER = '''
+import runpy
+config = runpy.run_path('gunicorn.conf.py')
+config['on_starting'](None)
+from lessons.metrics import LOGINS
+LOGINS.labels('success').inc()
+print(config['metrics_dir'])
+'''
+
+
+@override_settings(METRICS_TOKEN='scraper-token')
+class MetricsViewTest(TestCase):
+    """Test suite for the Prometheus metrics endpoint and the counters behind it."""
+    fixtures = ['lessons/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.url = reverse('metrics')
+        self.user = CustomUser.objects.get(email='johndoe@example.org')
+        student, created = Group.objects.get_or_create(name='Student')
+        student.user_set.add(self.user)
+        bank = Bank.objects.create_bank(self.user)
+        bank.balance = 100
+        bank.save()
+        self.booking = Booking.objects.create(day='FRI', time=datetime.time(16, 0), teacher='Smith Jane',
+                                              start_date=datetime.date(2022, 12, 2), duration=60,
+                                              interval=2, number_of_lessons=6, full_price=300,
+                                              user=self.user)
+
+    def _sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_metrics_url(self):
+        self.assertEqual(self.url, '/metrics')
+
+    def test_metrics_are_in_prometheus_format(self):
+        self.client.get(reverse('home'))
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer scraper-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'msms_requests_total{method="GET",status="200",view="home"}', response.content)
+        self.assertIn(b'msms_request_duration_seconds_bucket{le="0.005",view="home"}', response.content)
+
+    def test_metrics_need_the_scraper_token(self):
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer wrong-token')
+        self.assertEqual(response.status_code, 404)
+        self.client.login(email=self.user.email, password='Password123')
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_are_off_without_a_token(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer ')
+        self.assertEqual(response.status_code, 404)
+
+    def test_requests_and_their_queries_are_counted_per_view(self):
+        requests = self._sample('msms_requests_total', view='log_in', method='GET', status='200')
+        observed = self._sample('msms_request_queries_count', view='log_in')
+        self.client.get(reverse('log_in'))
+        self.assertEqual(self._sample('msms_requests_total', view='log_in', method='GET', status='200'), requests + 1)
+        self.assertEqual(self._sample('msms_request_queries_count', view='log_in'), observed + 1)
+
+    def test_unknown_urls_share_one_label(self):
+        before = self._sample('msms_requests_total', view='unmatched', method='GET', status='404')
+        self.client.get('/no/such/page/')
+        self.assertEqual(self._sample('msms_requests_total', view='unmatched', method='GET', status='404'), before + 1)
+
+    def test_logins_are_counted(self):
+        successes = self._sample('msms_logins_total', outcome='success')
+        failures = self._sample('msms_logins_total', outcome='failure')
+        self.client.post(reverse('log_in'), {'email': self.user.email, 'password': 'WrongPassword123'})
+        self.client.post(reverse('log_in'), {'email': self.user.email, 'password': 'Password123'})
+        self.assertEqual(self._sample('msms_logins_total', outcome='success'), successes + 1)
+        self.assertEqual(self._sample('msms_logins_total', outcome='failure'), failures + 1)
+
+    def test_payments_are_counted(self):
+        successes = self._sample('msms_payments_total', outcome='success')
+        failures = self._sample('msms_payments_total', outcome='failure')
+        self.client.login(email=self.user.email, password='Password123')
+        payment = {'invoice_id': self.booking.id, 'transfer_date': '2022-12-01'}
+        self.client.post(reverse('transactions'), dict(payment, amount='60.00'))
+        self.client.post(reverse('transactions'), dict(payment, amount='60.00'))
+        self.assertEqual(self._sample('msms_payments_total', outcome='success'), successes + 1)
+        self.assertEqual(self._sample('msms_payments_total', outcome='failure'), failures + 1)
+
+    def test_metrics_add_up_the_samples_of_gunicorn_workers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            environ = {name: value for name, value in os.environ.items() if name != 'PROMETHEUS_MULTIPROC_DIR'}
+            worker = subprocess.run([sys.executable, '-c', WORKER], cwd=settings.BASE_DIR, check=True,
+                                    capture_output=True, text=True, env=dict(environ, TMPDIR=tmp))
+            metrics_dir = worker.stdout.strip()
+            self.assertEqual(os.path.dirname(metrics_dir), tmp)
+            with mock.patch.dict(os.environ, PROMETHEUS_MULTIPROC_DIR=metrics_dir):
+                text = metrics_text()
+        self.assertIn(b'msms_logins_total{outcome="success"} 1.0', text)
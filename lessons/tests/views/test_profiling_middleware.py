@@ -0,0 +1,47 @@
+import json
+from django.contrib.auth.models import Group
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from lessons.models import Bank, CustomUser
+
+
+class ProfilingMiddlewareTest(TestCase):
+    """Test suite for the Server-Timing and profile log line of sampled requests."""
+    fixtures = ['lessons/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.url = reverse('student')
+        self.user = CustomUser.objects.get(email='johndoe@example.org')
+        student, created = Group.objects.get_or_create(name='Student')
+        student.user_set.add(self.user)
+        Bank.objects.create_bank(self.user)
+        self.client.login(email=self.user.email, password='Password123')
+
+    def _timings(self, response):
+        return {entry.split(';')[0]: entry for entry in response['Server-Timing'].split(', ')}
+
+    @override_settings(PROFILING_SAMPLE_RATE=0)
+    def test_requests_are_not_profiled_when_sampling_is_off(self):
+        with self.assertNoLogs('lessons.profiling'):
+            response = self.client.get(self.url)
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1)
+    def test_sampled_request_gets_server_timing(self):
+        with self.assertLogs('lessons.profiling'):
+            response = self.client.get(self.url)
+        timings = self._timings(response)
+        self.assertEqual(set(timings), {'sql', 'template', 'auth', 'total'})
+        self.assertRegex(timings['sql'], r'^sql;dur=[\d.]+;desc="\d+ queries"$')
+        self.assertRegex(timings['total'], r'^total;dur=[\d.]+$')
+
+    @override_settings(PROFILING_SAMPLE_RATE=1)
+    def test_sampled_request_is_logged_as_json(self):
+        with self.assertLogs('lessons.profiling') as logs:
+            self.client.get(self.url)
+        profile = json.loads(logs.records[0].getMessage())
+        self.assertEqual(profile['view'], 'student')
+        self.assertEqual(profile['status'], 200)
+        self.assertGreater(profile['queries'], 0)
+        self.assertGreater(profile['template_ms'], 0)
+        self.assertGreaterEqual(profile['total_ms'], profile['template_ms'])
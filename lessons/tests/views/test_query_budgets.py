@@ -0,0 +1,54 @@
+import datetime
+from io import StringIO
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from lessons import seeding, terms
+from lessons.benchmarks import BENCHMARK_VIEWS, ROLE_EMAILS, run_benchmarks
+from lessons.models import Booking, Child, CustomUser, Request, SchoolTerm, Transaction
+from lessons.rollups import refresh_rollups
+from lessons.tests.helpers import QueryBudgetTester
+
+
+class QueryBudgetTest(QueryBudgetTester):
+    """Every view stays within its query budget, and runs as many queries with ten times the rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed', users=5, workers=1, stdout=StringIO())
+
+    def tearDown(self):
+        terms.invalidate_term_calendar()  # the calendar must not outlive the terms a previous test rolled back
+
+    def test_every_view_has_a_budget(self):
+        self.assertEqual(set(self.query_budgets()), {name for name, role, url_kwargs in BENCHMARK_VIEWS})
+
+    def test_query_counts_are_within_budget_and_do_not_grow_with_rows(self):
+        small = run_benchmarks(iterations=1)
+        self._grow_dataset(10)
+        large = run_benchmarks(iterations=1)
+        for name in small:
+            with self.subTest(view=name):
+                self.assertEqual(large[name]['status'], 200)
+                self.assertWithinQueryBudget(name, large[name]['queries'])
+                self.assertQueriesDoNotGrow(name, small[name]['queries'], large[name]['queries'])
+
+    def _grow_dataset(self, factor):
+        """Multiply the rows every page lists: students, admins, terms and the fixed student's own data."""
+        seeding.seed_students(5 * factor, batch_size=20)
+        student = CustomUser.objects.get(email=ROLE_EMAILS['Student'])
+        admin_group = Group.objects.get(name='Admin')
+        for number in range(3 * factor):
+            admin = CustomUser.objects.create_user(f'admin{number}@example.org', 'Extra', 'Admin')
+            admin_group.user_set.add(admin)
+            child = Child.objects.create(student=student, first_name='Child', last_name=str(number))
+            booking = Booking.objects.create(day='MON', time='09:00', teacher='Mr Green', start_date='2023-01-09',
+                                             duration=30, interval=1, number_of_lessons=4, full_price=200,
+                                             user=student, child=child)
+            Request.objects.create(daysAvailable='TUE', numberOfLessons=2, intervalBetweenLessons=1,
+                                   durationOfLessons=45, user=student, child=child)
+            Transaction.objects.create(invoice=booking, transfer_date=datetime.date(2023, 1, 9) +
+                                       datetime.timedelta(days=number), amount=20, user=student)
+        for year in range(2030, 2030 + factor):
+            SchoolTerm.objects.create(term_number='one', start_date=datetime.date(year, 9, 1),
+                                      end_date=datetime.date(year, 10, 20))
+        refresh_rollups()
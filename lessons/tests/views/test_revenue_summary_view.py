@@ -0,0 +1,55 @@
+import datetime
+from django.test import TestCase
+from django.urls import reverse
+from lessons.models import CustomUser, Transaction
+from lessons.rollups import refresh_rollups
+from lessons import terms
+from django.contrib.auth.models import Group
+
+
+class RevenueSummaryViewTest(TestCase):
+    """Test suite for the revenue summary read from the daily rollups."""
+    fixtures = ['lessons/tests/fixtures/default_user.json', 'lessons/tests/fixtures/other_users.json']
+
+    def setUp(self):
+        terms.invalidate_term_calendar()
+        self.url = reverse('revenue_summary')
+        self.user = CustomUser.objects.get(email='johndoe@example.org')
+        admin, created = Group.objects.get_or_create(name='Admin')
+        admin.user_set.add(self.user)
+        self.student = CustomUser.objects.get(email='janedoe@example.org')
+        Transaction.objects.create(invoice_number=1, transfer_date=datetime.date(2022, 11, 30), amount=20,
+                                   user=self.student)
+        Transaction.objects.create(invoice_number=1, transfer_date=datetime.date(2022, 12, 1), amount=30,
+                                   user=self.student)
+        refresh_rollups()
+
+    def test_revenue_summary_url(self):
+        self.assertEqual(self.url, '/revenue/')
+
+    def test_revenue_summary_redirects_students(self):
+        student, created = Group.objects.get_or_create(name='Student')
+        student.user_set.add(self.student)
+        self.client.login(email=self.student.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_revenue_per_month(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'revenue_summary.html')
+        self.assertEqual([(row['period'], row['revenue']) for row in response.context['rows']],
+                         [('2022-11', 20), ('2022-12', 30)])
+
+    def test_revenue_between_dates_as_csv(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url, {'start': '2022-12-01', 'format': 'csv'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith('2022-12,'))
+
+    def test_revenue_with_invalid_filters(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url, {'group_by': 'year'})
+        self.assertEqual(response.status_code, 400)
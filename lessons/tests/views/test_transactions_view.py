@@ -0,0 +1,73 @@
+import datetime
+from django.test import TestCase
+from django.urls import reverse
+from lessons.forms import TransactionForm
+from lessons.models import CustomUser, Bank, Booking, Transaction
+from django.contrib.auth.models import Group
+
+
+class TransactionsTest(TestCase):
+    """Test suite for the student payment view."""
+    fixtures = ['lessons/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.url = reverse('transactions')
+        self.user = CustomUser.objects.get(email='johndoe@example.org')
+        student, created = Group.objects.get_or_create(name='Student')
+        student.user_set.add(self.user)
+        self.bank = Bank.objects.create_bank(self.user)
+        self.bank.balance = 200
+        self.bank.save()
+        self.booking = Booking.objects.create(day='FRI', time=datetime.time(16, 0), teacher='Smith Jane',
+                                              start_date=datetime.date(2022, 12, 2), duration=60,
+                                              interval=2, number_of_lessons=6, full_price=300,
+                                              user=self.user)
+        self.form_input = {'invoice_id': self.booking.id, 'transfer_date': '2022-12-01', 'amount': '150.00'}
+
+    def test_transactions_url(self):
+        self.assertEqual(self.url, '/transactions/')
+
+    def test_get_transactions(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'transactions.html')
+        self.assertTrue(isinstance(response.context['form'], TransactionForm))
+
+    def test_successful_payment(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.post(self.url, self.form_input)
+        self.assertEqual(response.status_code, 200)
+        self.bank.refresh_from_db()
+        self.booking.refresh_from_db()
+        self.assertEqual(self.bank.balance, 50)
+        self.assertEqual(self.booking.payment_made, 150)
+        self.assertEqual(self.booking.transactions.get().amount, 150)
+
+    def test_payment_with_insufficient_balance(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self.form_input['amount'] = '250.00'
+        response = self.client.post(self.url, self.form_input)
+        self._assert_rejected(response, 'ERROR: Account balance is insufficient')
+
+    def test_payment_for_unknown_invoice(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self.form_input['invoice_id'] = self.booking.id + 1
+        response = self.client.post(self.url, self.form_input)
+        self._assert_rejected(response, 'ERROR: Invoice ID does not exist')
+
+    def test_payment_for_overpaid_invoice(self):
+        self.client.login(email=self.user.email, password='Password123')
+        self.booking.payment_made = 350
+        self.booking.save()
+        response = self.client.post(self.url, self.form_input)
+        self._assert_rejected(response, 'ERROR: Transaction for invoice ID already made', payment_made=350)
+
+    def _assert_rejected(self, response, message, payment_made=0):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([str(m) for m in response.context['messages']], [message])
+        self.bank.refresh_from_db()
+        self.booking.refresh_from_db()
+        self.assertEqual(self.bank.balance, 200)
+        self.assertEqual(self.booking.payment_made, payment_made)
+        self.assertFalse(Transaction.objects.exists())
@@ -1,11 +1,21 @@
+import hmac
+import io
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Exists, OuterRef, Q
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render, redirect
-from lessons.forms import LogInForm, SignUpForm, RequestForm, ChildrenForm, BalanceForm, EditAdminForm, BookingForm, SchoolTermForm, TransactionForm
+from lessons.forms import LogInForm, SignUpForm, RequestForm, ChildrenForm, BalanceForm, EditAdminForm, BookingForm, SchoolTermForm, TransactionForm, BookingFilterForm, TransactionExportForm, StatementUploadForm, BalanceReportForm, RollupSummaryForm
 from django.contrib.auth.models import Group
 from lessons.models import CustomUser, Bank, Request, Booking, SchoolTerm, Transaction
-from .helpers import group_required, login_prohibited, login_required
+from .exports import EXPORT_FORMATS, TRANSACTION_EXPORT_FIELDS, export_lines, transactions_for_export
+from .reports import BALANCE_REPORT_FIELDS, ROLLUP_SUMMARY_FIELDS, balance_page, balance_rows, balances, parse_balance_key, rollup_summary
+from .metrics import CONTENT_TYPE_LATEST, LOGINS, PAYMENTS, metrics_text
+from .payments import make_payment, PaymentError
+from .statements import STATEMENT_ENCODING, StatementAlreadyImported, import_statement, read_statement, statement_digest
+from .helpers import group_required, login_prohibited, login_required, get_user_groups, get_int_param, keyset_page, page_url
 
 @login_prohibited
 def log_in(request):
@@ -16,13 +26,16 @@ def log_in(request):
             password = form.cleaned_data.get('password')
             user = authenticate(email=email, password=password)
             if user is not None:
+                LOGINS.labels('success').inc()
                 login(request, user)
-                if user.groups.filter(name='Director').exists(): #logs the user into different pages based on their group
+                groups = get_user_groups(user)
+                if 'Director' in groups: #logs the user into different pages based on their group
                     return redirect('admin_list')
-                elif user.groups.filter(name='Admin').exists():
+                elif 'Admin' in groups:
                     return redirect('administrators')
                 else:
                     return redirect('student')
+            LOGINS.labels('failure').inc()
             # Add error message
             messages.add_message(request, messages.ERROR, "The credentials provided were invalid!")
     form = LogInForm()
@@ -75,9 +88,26 @@ def administrators(request):
             Booking.objects.get(id=booking_id).delete()
             messages.add_message(request, messages.INFO, 'Booking has been deleted.')
             return redirect('administrators')
-    requests = Request.objects.all()
-    bookings = Booking.objects.all()
-    return render(request, 'administrators.html', {'request': requests, 'booking': bookings})
+    filter_form = BookingFilterForm(request.GET)
+    requests = Request.objects.select_related('user').only(
+        'daysAvailable', 'numberOfLessons', 'intervalBetweenLessons', 'durationOfLessons', 'furtherInformation',
+        'user__email')
+    bookings = Booking.objects.select_related('user').only(
+        'day', 'time', 'teacher', 'start_date', 'duration', 'interval', 'number_of_lessons', 'price_per_lesson',
+        'user__email')
+    if filter_form.is_valid():
+        requests = filter_form.filter_requests(requests)
+        bookings = filter_form.filter_bookings(bookings)
+    requests, next_request = keyset_page(requests, get_int_param(request.GET, 'requests_after'))
+    bookings, next_booking = keyset_page(bookings, get_int_param(request.GET, 'bookings_after'))
+    context = {
+        'request': requests,
+        'booking': bookings,
+        'filter_form': filter_form,
+        'next_requests_url': page_url(request, requests_after=next_request) if next_request else None,
+        'next_bookings_url': page_url(request, bookings_after=next_booking) if next_booking else None,
+    }
+    return render(request, 'administrators.html', context)
 
 
 @group_required('Admin')
@@ -115,8 +145,7 @@ def edit_booking(request, booking_id):
         if request.method == 'POST':
             form = BookingForm(request.POST, instance=bookings) #initial values are the values of the current booking
             if form.is_valid():
-                bookings.delete()
-                bookings = form.save(bookings.user)
+                bookings = form.save()
                 messages.add_message(request, messages.INFO, 'Booking has been successfully edited.')
                 return redirect('administrators')
         else:
@@ -140,10 +169,13 @@ def create_admin(request):
 
 @group_required('Director')
 def admin_list(request):
-    admin = []
-    for user in CustomUser.objects.all():
-        if user.groups.filter(name='Admin').exists(): #find all the admin users
-            admin.append(user)
+    search = request.GET.get('q', '').strip()
+    admins = CustomUser.objects.filter(groups__name='Admin').only('email', 'first_name', 'last_name').annotate(
+        is_director=Exists(Group.objects.filter(name='Director', user=OuterRef('pk')))
+    )
+    if search: #case-insensitive prefix search, served by the search indexes of migration 0004
+        admins = admins.filter(Q(email__istartswith=search) | Q(first_name__istartswith=search) |
+                               Q(last_name__istartswith=search))
     if request.method == 'POST':
         if request.POST.get("edit"): #check if user clicks on the edit, delete or super admin button
             user_email = request.POST.get("edit")
@@ -163,7 +195,10 @@ def admin_list(request):
             else:
                 director.user_set.add(user) #make the user a director
         return redirect('admin_list')
-    return render(request, 'admin_list.html', {'admin': admin})
+    admin, next_after = keyset_page(admins, get_int_param(request.GET, 'after'))
+    context = {'admin': admin, 'search': search,
+               'next_url': page_url(request, after=next_after) if next_after else None}
+    return render(request, 'admin_list.html', context)
 
 
 @login_required
@@ -220,9 +255,9 @@ def edit_request(request, request_id):
 def student(request):
     current_user = request.user
     user_id = current_user.id
-    account = Bank.objects.get(user=current_user)
-    all_requests = Request.objects.filter(user=current_user)
-    all_bookings = Booking.objects.filter(user=current_user)
+    account = Bank.objects.only('balance').get(user=current_user)
+    all_requests = Request.objects.filter(user=current_user).select_related('child')
+    all_bookings = Booking.objects.filter(user=current_user).select_related('child')
     balance = account.balance
     if request.method == 'POST':
         if request.POST.get("delete"):
@@ -239,41 +274,100 @@ def student(request):
 
 @group_required('Student')
 def transactions(request):
-    account = Bank.objects.get(user=request.user)
-    balance = account.balance
     if request.method == 'POST':
         form = TransactionForm(request.POST)
         if form.is_valid():
-            new_invoice = form.save(request.user)
-            if Booking.objects.filter(id=new_invoice.invoice_id).exists():
-                current_booking = Booking.objects.get(id=new_invoice.invoice_id)
-                if current_booking.payment_made <= current_booking.full_price:
-                    if balance >= new_invoice.amount: #automatically deduct the price of invoice if there is sufficient amount in balance
-                        account.balance -= int(float(new_invoice.amount))
-                        current_booking.payment_made += new_invoice.amount
-                        current_booking.save()
-                        account.save()
-                    else:
-                        new_invoice.delete()
-                        redirect('student')
-                        messages.add_message(request, messages.ERROR, "ERROR: Account balance is insufficient")
-                else: #payment has been made
-                    new_invoice.delete()
-                    redirect('student')
-                    messages.add_message(request, messages.ERROR, "ERROR: Transaction for invoice ID already made")
+            try:
+                make_payment(request.user, form.cleaned_data.get('invoice_id'),
+                             form.cleaned_data.get('transfer_date'), form.cleaned_data.get('amount'))
+            except PaymentError as error:
+                PAYMENTS.labels('failure').inc()
+                messages.add_message(request, messages.ERROR, str(error))
             else:
-                new_invoice.delete()
-                redirect('student')
-                messages.add_message(request, messages.ERROR, "ERROR: Invoice ID does not exist")
+                PAYMENTS.labels('success').inc()
     else:
         form = TransactionForm()
     return render(request, 'transactions.html', {'form': form})
 
 @group_required('Admin')
 def all_transactions(request):
-    all_transactions = Transaction.objects.all()
+    all_transactions = Transaction.objects.select_related('user').only(
+        'invoice_number', 'transfer_date', 'amount', 'user__email', 'user__first_name', 'user__last_name')
     return render(request, 'all_transactions.html', {'transactions': all_transactions})
 
+@group_required('Admin')
+def export_transactions(request):
+    form = TransactionExportForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest('Invalid export filters.')
+    export_format = form.cleaned_data.get('format') or 'csv'
+    rows = transactions_for_export(form.cleaned_data.get('start'), form.cleaned_data.get('end'),
+                                   form.cleaned_data.get('user'))
+    response = StreamingHttpResponse(export_lines(rows, TRANSACTION_EXPORT_FIELDS, export_format),
+                                     content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="transactions.{export_format}"'
+    return response
+
+def metrics(request):
+    # Only the Prometheus scraper is given the token; without a token configured there is no endpoint
+    token = settings.METRICS_TOKEN
+    if not token or not hmac.compare_digest(request.headers.get('Authorization', '').encode(),
+                                            f'Bearer {token}'.encode()):
+        raise Http404
+    return HttpResponse(metrics_text(), content_type=CONTENT_TYPE_LATEST)
+
+@group_required('Admin')
+def balance_report(request):
+    form = BalanceReportForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest('Invalid report filters.')
+    rows = balances(form.cleaned_data.get('show') or 'debtors')
+    export_format = form.cleaned_data.get('format')
+    if export_format:
+        response = StreamingHttpResponse(export_lines(balance_rows(rows), BALANCE_REPORT_FIELDS, export_format),
+                                         content_type=EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="balances.{export_format}"'
+        return response
+    page, next_after = balance_page(rows, parse_balance_key(request.GET.get('after')))
+    next_url = page_url(request, after=next_after) if next_after else None
+    return render(request, 'balance_report.html', {'form': form, 'balances': page, 'next_url': next_url})
+
+@group_required('Admin')
+def revenue_summary(request):
+    form = RollupSummaryForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest('Invalid report filters.')
+    rows = rollup_summary(form.cleaned_data.get('group_by') or 'month', form.cleaned_data.get('start'),
+                          form.cleaned_data.get('end'))
+    export_format = form.cleaned_data.get('format')
+    if export_format:
+        lines = export_lines([[row[field] for field in ROLLUP_SUMMARY_FIELDS] for row in rows], ROLLUP_SUMMARY_FIELDS,
+                             export_format)
+        response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[export_format])
+        response['Content-Disposition'] = f'attachment; filename="revenue.{export_format}"'
+        return response
+    return render(request, 'revenue_summary.html', {'form': form, 'rows': rows})
+
+@group_required('Admin')
+def import_bank_statement(request):
+    rejected = []
+    if request.method == 'POST':
+        form = StatementUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['statement']
+            digest = statement_digest(upload)
+            statement = io.TextIOWrapper(upload.file, encoding=STATEMENT_ENCODING, newline='')
+            try:
+                imported, rejected = import_statement(read_statement(statement), digest=digest)
+            except StatementAlreadyImported as error:
+                form.add_error('statement', str(error))
+            else:
+                messages.add_message(request, messages.INFO, f'{imported} payments imported, {len(rejected)} rows rejected.')
+                form = StatementUploadForm()
+    else:
+        form = StatementUploadForm()
+    return render(request, 'import_statement.html', {'form': form, 'rejected': rejected})
+
 @group_required('Student')
 def update_balance(request):
     account = Bank.objects.get(user=request.user)
@@ -331,18 +425,11 @@ def edit_term(request, term_id):
         return redirect('school_term')
     else:
         if request.method == 'POST':
-            original = SchoolTermForm(instance=term).save(commit=False)
             form = SchoolTermForm(request.POST, instance=term)
-            term.delete()  #delete term so that validation can exclude the values of this term
             if form.is_valid():
-                term = form.save(commit=False)
-                term.id = term_id #make the new term have the same id as the initial one
-                term.save()
+                form.save()
                 messages.add_message(request, messages.INFO, 'Update Successful.')
                 return redirect('school_term')
-            else:
-                original.id = term_id
-                original.save() #if form is not valid create the same term object again
         else:
             form = SchoolTermForm(instance=term)
         return render(request, 'edit_term.html', {'form': form, 'term_id': term_id})
@@ -46,6 +46,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'lessons.health.HealthCheckMiddleware',
+    'lessons.profiling.ProfilingMiddleware',
+    'lessons.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -58,9 +61,26 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'msms.urls'
 
+# Bearer token the Prometheus scraper sends to /metrics (unset turns the endpoint off)
+METRICS_TOKEN = os.getenv("DJANGO_METRICS_TOKEN", "")
+
+# Fraction of requests profiled by lessons.profiling.ProfilingMiddleware (0 turns profiling off)
+PROFILING_SAMPLE_RATE = float(os.getenv("DJANGO_PROFILING_SAMPLE_RATE", "0"))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'lessons.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'lessons.profiling.ProfiledDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'temp')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -69,6 +89,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'lessons.context_processors.user_groups',
             ],
         },
     },
@@ -96,6 +117,8 @@ if os.getenv("DB_HOST"):
             "PASSWORD": os.getenv("DB_PASSWORD", ""),
             "HOST": os.getenv("DB_HOST"),   # Cloud SQL 通过 /cloudsql/<connectionName>
             "PORT": os.getenv("DB_PORT", "5432"),
+            # bound how long a request or readiness probe waits for an unreachable database
+            "OPTIONS": {"connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "5"))},
         }
     }
 else:
@@ -31,6 +31,11 @@ urlpatterns = [
     path('create_admin/', views.create_admin, name='create_admin'),
     path('administrator/', views.administrators, name='administrators'),
     path('all_transactions/', views.all_transactions, name='all_transactions'),
+    path('all_transactions/export/', views.export_transactions, name='export_transactions'),
+    path('metrics', views.metrics, name='metrics'),
+    path('all_transactions/import/', views.import_bank_statement, name='import_statement'),
+    path('balances/', views.balance_report, name='balance_report'),
+    path('revenue/', views.revenue_summary, name='revenue_summary'),
     path('director/', views.admin_list, name="admin_list"),
     path('edit/<int:user_id>', views.edit_user, name='edit_user'),
     path('school_term/', views.school_term, name='school_term'),